@@ -1,41 +1,117 @@
 # -*- coding: utf-8 -*-
 
+import json
+import threading
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, Optional
 import logging
 
+# 分析提示词模板，缺失的字段显示为 '未知'
+_PROMPT_TMPL = """请用中文分析以下股票数据并提供投资建议：
+
+股票信息：
+- 名称: {name}
+- 代码: {ts_code}
+- 当前价格: {price}
+- 市盈率(PE): {pe_ttm}
+- 市净率(PB): {pb}
+- 净资产收益率(ROE): {roe}%
+- 资产负债率: {debt_ratio}%
+- 股息率: {dividend_yield}%
+
+请提供以下分析：
+1. 市场地位分析
+   - 行业地位
+   - 竞争优势
+   - 市场份额
+
+2. 财务健康状况
+   - 盈利能力
+   - 资产质量
+   - 现金流状况
+
+3. 风险分析
+   - 市场风险
+   - 财务风险
+   - 经营风险
+
+4. 投资建议
+   - 投资评级
+   - 目标价位
+   - 建仓策略
+
+5. 重点监控指标
+   - 关键财务指标
+   - 技术指标
+   - 风险指标
+
+请以清晰的结构化格式输出，使用标题、要点和分段来组织内容。对每个分析点给出具体的数据支持和理由。"""
+
+
+class _SafeDict(dict):
+    """format_map 使用的字典，缺失的键返回 '未知'"""
+
+    def __missing__(self, key: str) -> str:
+        return '未知'
+
+
 class AIAnalyzer:
-    def __init__(self, model: str = "deepseek-coder-v2:16b", host: str = "http://localhost:11434"):
+    def __init__(self, model: str = "deepseek-coder-v2:16b", host: str = "http://localhost:11434",
+                 keep_alive: str = "30m", warmup: bool = True):
         """Initialize the AI Analyzer.
         
         Args:
             model (str): The Ollama model to use (e.g., 'mistral', 'llama2', 'codellama')
             host (str): The Ollama API host address
+            keep_alive (str): How long Ollama keeps the model loaded after a request
+            warmup (bool): Load the model in a background thread at construction
         """
         self.model = model
         self.host = host
         self.api_endpoint = f"{host}/api/generate"
+        self.keep_alive = keep_alive
+
+        # Reuse one keep-alive connection to the Ollama server across calls
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+        if warmup:
+            threading.Thread(target=self._warmup, daemon=True).start()
+
+    def _warmup(self) -> None:
+        """Ask Ollama to load the model so the first analysis skips the cold start."""
+        try:
+            self.session.post(
+                self.api_endpoint,
+                json={"model": self.model, "prompt": "", "stream": False, "keep_alive": self.keep_alive},
+                timeout=300
+            )
+        except Exception as e:
+            logging.warning(f"预加载AI模型失败: {str(e)}")
         
-    def analyze_stock(self, stock_data: Dict[str, Any]) -> Optional[str]:
-        """Analyze stock data using the AI model.
+    def analyze_stock(self, stock_data: Dict[str, Any]) -> Iterator[str]:
+        """Stream the analysis of stock data from the AI model.
         
         Args:
             stock_data: Dictionary containing stock information and metrics
             
-        Returns:
-            str: AI-generated analysis and recommendations
+        Yields:
+            str: Fragments of the AI-generated analysis, in generation order.
+            Nothing is yielded if the request fails.
         """
         try:
             # Prepare the prompt
             prompt = self._create_analysis_prompt(stock_data)
             
-            # Call Ollama API with proper encoding
-            response = requests.post(
+            # Call Ollama API, streaming tokens as they are generated
+            response = self.session.post(
                 self.api_endpoint,
                 json={
                     "model": self.model,
                     "prompt": prompt,
-                    "stream": False,
+                    "stream": True,
+                    "keep_alive": self.keep_alive,
                     "options": {
                         "temperature": 0.7,
                         "top_p": 0.9
@@ -45,59 +121,39 @@ class AIAnalyzer:
                     "Content-Type": "application/json",
                     "Accept": "application/json",
                     "Accept-Charset": "utf-8"
-                }
+                },
+                stream=True
             )
             
-            if response.status_code == 200:
-                # Ensure proper UTF-8 decoding
-                result = response.json()["response"]
-                return result.encode('utf-8').decode('utf-8')
-            else:
-                logging.error(f"获取AI分析失败: {response.status_code}")
-                return None
+            with response:
+                if response.status_code != 200:
+                    logging.error(f"获取AI分析失败: {response.status_code}")
+                    return
+
+                # Ollama 流式接口每行返回一个JSON对象
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
                 
         except Exception as e:
             logging.error(f"AI分析过程中出现错误: {str(e)}")
-            return None
+
+    def analyze_stock_full(self, stock_data: Dict[str, Any]) -> Optional[str]:
+        """Analyze stock data using the AI model and return the complete result.
+        
+        Args:
+            stock_data: Dictionary containing stock information and metrics
+            
+        Returns:
+            str: AI-generated analysis and recommendations, or None on failure
+        """
+        return "".join(self.analyze_stock(stock_data)) or None
             
     def _create_analysis_prompt(self, stock_data: Dict[str, Any]) -> str:
         """Create a detailed prompt for the AI model."""
-        return f"""请用中文分析以下股票数据并提供投资建议：
-
-股票信息：
-- 名称: {stock_data.get('name', '未知')}
-- 代码: {stock_data.get('ts_code', '未知')}
-- 当前价格: {stock_data.get('price', '未知')}
-- 市盈率(PE): {stock_data.get('pe_ttm', '未知')}
-- 市净率(PB): {stock_data.get('pb', '未知')}
-- 净资产收益率(ROE): {stock_data.get('roe', '未知')}%
-- 资产负债率: {stock_data.get('debt_ratio', '未知')}%
-- 股息率: {stock_data.get('dividend_yield', '未知')}%
-
-请提供以下分析：
-1. 市场地位分析
-   - 行业地位
-   - 竞争优势
-   - 市场份额
-
-2. 财务健康状况
-   - 盈利能力
-   - 资产质量
-   - 现金流状况
-
-3. 风险分析
-   - 市场风险
-   - 财务风险
-   - 经营风险
-
-4. 投资建议
-   - 投资评级
-   - 目标价位
-   - 建仓策略
-
-5. 重点监控指标
-   - 关键财务指标
-   - 技术指标
-   - 风险指标
-
-请以清晰的结构化格式输出，使用标题、要点和分段来组织内容。对每个分析点给出具体的数据支持和理由。""" 
\ No newline at end of file
+        return _PROMPT_TMPL.format_map(_SafeDict(stock_data))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# JSON解析函数，eastmoney_api、data_fetcher 解析接口响应时也从这里导入
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # 未安装orjson时使用标准库解析
+    _json_loads = json.loads
+
+
+def _load_json(raw: bytes) -> Any:
+    """优先用orjson解析；orjson不接受标准库写出的NaN、Infinity，遇到时交给标准库"""
+    try:
+        return _json_loads(raw)
+    except ValueError:
+        return json.loads(raw)
+
+
+class TTLCache:
+    """线程安全的内存缓存，条目超过有效期后失效，超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，不存在或已过期时返回 default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """写入缓存，ttl 为空时使用默认有效期"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+
+class FileCache:
+    """持久化到本地目录的缓存，每个条目保存为一个JSON文件，进程重启后仍然有效
+
+    值必须能被JSON序列化。条目按键的MD5命名，过期时间使用系统时间记录。
+    """
+
+    def __init__(self, directory: str, ttl: float = 3600):
+        self.directory = directory
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """由请求地址、参数等生成缓存键，参数字典按键排序后参与计算"""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取缓存，不存在、已过期或文件损坏时返回 default"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                item = _load_json(f.read())
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            logging.warning("读取缓存失败: %s, %s", path, e)
+            return default
+        if item.get('expires_at', 0) < time.time():
+            return default
+        return item.get('value', default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存，先写临时文件再替换，避免并发读到半个文件"""
+        ttl = self.ttl if ttl is None else ttl
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': time.time() + ttl, 'value': value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning("写入缓存失败: %s, %s", path, e)
+            # 序列化失败或替换失败时删除残留的临时文件
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """删除目录下的全部缓存文件"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -2,34 +2,158 @@
 
 # -*- coding: utf-8 -*-
 
+import asyncio
+import concurrent.futures
+import functools
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 import time
-from datetime import datetime
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import re
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
 import random
+import numpy as np
 import pandas as pd
+from io import StringIO
+
+from cache import FileCache, TTLCache, _json_loads
+from eastmoney_common import EASTMONEY_UT, QUOTE_URL, parse_quotes, quote_batches, to_secid
+from kernels import compute_indicators
+
+# 配置日志：日志记录先放入队列，由后台线程写入文件和控制台，避免请求线程阻塞在磁盘I/O上
+_log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+_log_handlers = [
+    logging.FileHandler("stock_analyzer.log", encoding="utf-8"),
+    logging.StreamHandler(),
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+# 队列端只合并消息参数，完整格式由写入端的 _log_formatter 负责
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger("data_fetcher")
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("stock_analyzer.log", encoding="utf-8"),
-        logging.StreamHandler(),
-    ],
+# K线数据本地缓存目录及有效期（秒）
+KLINE_CACHE_DIR = os.path.join("cache", "kline")
+KLINE_CACHE_TTL = 30 * 24 * 3600
+# 实时行情、财务指标的内存缓存有效期（秒）
+QUOTE_CACHE_TTL = 5
+FINANCIAL_CACHE_TTL = 6 * 3600
+# 每个主机每秒最多请求次数及允许的突发请求数
+MAX_REQUESTS_PER_SECOND = 10
+MAX_REQUEST_BURST = 20
+# 可以重试的HTTP状态码（5xx 之外）
+RETRYABLE_STATUS_CODES = (408, 429)
+# 行情、财务、K线接口所在的主机，初始化时预先建立连接
+EASTMONEY_HOSTS = (
+    "https://push2.eastmoney.com",
+    "https://datacenter-web.eastmoney.com",
+    "https://push2his.eastmoney.com",
 )
-logger = logging.getLogger("data_fetcher")
+
+# 股票代码前三位对应的市场
+# 沪市：600/601/603/605 主板，688 科创板
+# 深市：000 主板，002 中小板，300/301 创业板
+_PREFIX_MARKET = {p: 'sh' for p in ('600', '601', '603', '605', '688')} | {p: 'sz' for p in ('000', '002', '300', '301')}
+# 删除所有非数字的ASCII字符
+_DIGITS_ONLY = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+_STOCK_CODE_RE = re.compile(r'^(sh|sz)?(\d{6})$', re.I)
+_CANONICAL_CODE_RE = re.compile(r'(sh|sz)\d{6}')
+
+# K线字段，顺序与接口 fields2 一致
+KLINE_COLUMNS = ['date', 'open', 'close', 'high', 'low', 'volume', 'amount',
+                 'amplitude', 'change_percent', 'change_amount', 'turnover']
+# 价格类字段精度要求不高，使用 float32；成交量、成交额数值较大，保留 float64
+KLINE_DTYPES = {
+    'open': 'float32', 'close': 'float32', 'high': 'float32', 'low': 'float32',
+    'volume': 'float64', 'amount': 'float64',
+    'amplitude': 'float32', 'change_percent': 'float32', 'change_amount': 'float32', 'turnover': 'float32',
+}
+# 校验增量K线与缓存是否一致时比较的价格字段
+KLINE_PRICE_COLUMNS = ['open', 'close', 'high', 'low']
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_stock_code(code: str) -> str:
+    """将各种写法的股票代码转换为 sh600000 形式，同一输入的结果会被缓存"""
+    # 去除空格和点
+    code = code.strip().replace('.', '')
+
+    match = _STOCK_CODE_RE.match(code)
+    if match:
+        prefix, digits = match.groups()
+        # 如果已经有前缀，直接返回小写形式
+        if prefix:
+            return code.lower()
+        code = digits
+    else:
+        if code[:2].lower() in ('sh', 'sz'):
+            return code.lower()
+
+        # 去除所有非数字字符
+        code = code.translate(_DIGITS_ONLY)
+        if len(code) != 6:
+            raise ValueError("股票代码必须是6位数字")
+
+    # 根据股票代码前三位判断市场
+    market = _PREFIX_MARKET.get(code[:3])
+    if market is None:
+        raise ValueError("无效的股票代码")
+    return f"{market}{code}"
+
+
+class RateLimiter:
+    """按主机划分的令牌桶限流器，主动控制请求速率，避免触发服务端限流"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
 
 
 class StockDataFetcher:
-    def __init__(self, tushare_token: str = None):
+    # 接口地址与固定参数
+    _FINANCIAL_URL = "https://datacenter-web.eastmoney.com/api/data/v1/get"
+    _KLINE_URL = "https://push2his.eastmoney.com/api/qt/stock/kline/get"
+    _KLINE_FIELDS1 = 'f1,f2,f3,f4,f5,f6'
+    _KLINE_FIELDS2 = 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61'
+    # K线周期对应的 klt 参数
+    _PERIOD_MAP = {'daily': '101', 'weekly': '102', 'monthly': '103'}
+
+    def __init__(self, tushare_token: str = None, warmup: bool = True):
         """初始化数据获取器
 
         Args:
             tushare_token: 可选的Tushare token，用于备用数据源
+            warmup: 是否在后台预先建立到各接口主机的连接
         """
         # 初始化请求头和会话
         self.headers = {
@@ -37,25 +161,98 @@ class StockDataFetcher:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
             'Connection': 'keep-alive',
+            # 只声明本地能解压的编码（安装了brotli时包含br）
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
         }
         self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # 复用长连接，避免每次请求重新握手；重试由 _make_request 负责
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=0))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.stream = False
         self.retry_count = 3
+        # 各数据接口相互独立，用线程池并发请求；Session 的连接池已按并发量调大
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+        self._rate_limiter = RateLimiter(MAX_REQUESTS_PER_SECOND, MAX_REQUEST_BURST)
+        self._kline_cache = FileCache(KLINE_CACHE_DIR, ttl=KLINE_CACHE_TTL)
+        # 缓存随实例创建和释放；实时行情按股票缓存，空结果通常表示请求失败，不写入缓存
+        self._quote_cache = TTLCache(maxsize=2048, ttl=QUOTE_CACHE_TTL)
+        self._financial_cache = TTLCache(maxsize=4096, ttl=FINANCIAL_CACHE_TTL)
+        # 正在进行中的请求，相同的并发请求共享同一个结果
+        self._inflight: Dict[tuple, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        if warmup:
+            for host in EASTMONEY_HOSTS:
+                self._pool.submit(self._warmup_connection, host)
+
+    def _warmup_connection(self, host: str) -> None:
+        """提前完成TCP和TLS握手，连接留在连接池中供首次请求复用"""
+        try:
+            self.session.head(host, timeout=3)
+        except requests.RequestException as e:
+            logging.debug("预建立连接失败: %s, %s", host, e)
 
     def _make_request(self, url, params, timeout=5):
-        """封装请求方法，增加重试机制"""
+        """发送请求，合并并发的相同请求
+
+        同一 URL 和参数的请求正在进行时，后到的调用直接等待并共用它的结果，
+        不再重复请求接口。
+        """
+        key = (url, tuple(sorted(params.items())) if params else ())
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        result = None
+        try:
+            result = self._request_with_retry(url, params, timeout)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            future.set_result(result)
+        return result
+
+    def _request_with_retry(self, url, params, timeout=5):
+        """封装请求方法，增加重试机制
+
+        只有连接失败、超时、429 和 5xx 等可恢复的错误会重试，重试间隔为带随机抖动的指数退避；
+        其他 4xx 错误重试也不会成功，直接返回 None。
+        """
+        host = urlparse(url).netloc
         for i in range(self.retry_count):
+            self._rate_limiter.acquire(host)
             try:
-                response = self.session.get(url, params=params, headers=self.headers, timeout=timeout)
+                response = self.session.get(url, params=params, timeout=timeout)
                 response.raise_for_status()
-                return response.json()
-            except requests.RequestException as e:
-                logging.warning(f"请求失败，重试第 {i + 1} 次: {str(e)}")
-                time.sleep(2 ** i)  # 指数退避
-        logging.error(f"请求失败，达到最大重试次数: {url}")
+                return _json_loads(response.content)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else 0
+                if status < 500 and status not in RETRYABLE_STATUS_CODES:
+                    logging.error("请求失败，不可恢复的错误 %d: %s", status, url)
+                    return None
+                logging.warning("请求失败，重试第 %d 次: %s", i + 1, e)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logging.warning("请求失败，重试第 %d 次: %s", i + 1, e)
+            except (requests.RequestException, ValueError) as e:
+                logging.error("请求失败: %s, %s", url, e)
+                return None
+
+            if i < self.retry_count - 1:
+                # 指数退避，叠加随机抖动避免多个请求同时重试
+                time.sleep(min(30.0, (2 ** i) * (1 + random.uniform(0, 0.5))))
+        logging.error("请求失败，达到最大重试次数: %s", url)
         return None
 
     def get_stock_info(self, code_or_name: str) -> Dict[str, Any]:
-        """获取股票基本信息
+        """获取股票基本信息，实时行情与财务指标在线程池中并发请求
 
         Args:
             code_or_name: 股票代码或名称
@@ -67,43 +264,118 @@ class StockDataFetcher:
             # 格式化股票代码
             stock_code = self._format_stock_code(code_or_name)
             if not stock_code:
-                logging.error(f"无效的股票代码或名称: {code_or_name}")
+                logging.error("无效的股票代码或名称: %s", code_or_name)
                 return {}
 
-            # 获取实时行情
-            quotes = self._get_realtime_quotes(stock_code)
-            if not quotes:
-                return {}
+            return self.get_stocks_info([stock_code]).get(stock_code, {})
 
-            # 获取财务指标
-            financial = self.get_financial_indicators(stock_code)
-
-            # 合并数据
-            stock_data = {
-                "ts_code": stock_code,
-                "name": quotes.get("name", ""),
-                "price": quotes.get("price", 0.0),
-                "change_percent": quotes.get("change_percent", 0.0),
-                "pe_ttm": financial.get("pe_ttm", 0.0),
-                "pb": financial.get("pb", 0.0),
-                "total_shares": financial.get("total_share", 0.0),
-                "float_shares": financial.get("float_share", 0.0),
-                "total_assets": financial.get("total_assets", 0.0),
-                "revenue": financial.get("revenue", 0.0),
-                "net_profit": financial.get("net_profit", 0.0),
-                "roe": financial.get("roe", 0.0),
-                "debt_ratio": financial.get("debt_ratio", 0.0),
-                "gross_margin": financial.get("gross_margin", 0.0),
-                "dividend_yield": financial.get("dividend_yield", 0.0),
-                "industry": financial.get("industry", ""),
-            }
+        except Exception as e:
+            logging.error("获取股票信息失败: %s", e)
+            return {}
 
-            return stock_data
+    async def aget_stock_info(self, code_or_name: str) -> Dict[str, Any]:
+        """异步获取股票基本信息，实时行情与财务指标并发请求
+
+        Args:
+            code_or_name: 股票代码或名称
+
+        Returns:
+            包含股票基本信息的字典
+        """
+        try:
+            # 格式化股票代码
+            stock_code = self._format_stock_code(code_or_name)
+            if not stock_code:
+                logging.error("无效的股票代码或名称: %s", code_or_name)
+                return {}
+
+            stocks = await self.aget_stocks_info([stock_code])
+            return stocks.get(stock_code, {})
 
         except Exception as e:
-            logging.error(f"获取股票信息失败: {str(e)}")
+            logging.error("获取股票信息失败: %s", e)
+            return {}
+
+    def get_stocks_info(self, codes_or_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取股票基本信息，实时行情合并为批量请求，财务指标在线程池中并发请求
+
+        Args:
+            codes_or_names: 股票代码或名称列表
+
+        Returns:
+            以股票代码为键的股票基本信息字典，获取失败的股票不包含在内
+        """
+        stock_codes = self._format_stock_codes(codes_or_names)
+        if not stock_codes:
+            return {}
+
+        quotes_future = self._pool.submit(self.get_realtime_quotes_batch, stock_codes)
+        financial_futures = [self._pool.submit(self.get_financial_indicators, code) for code in stock_codes]
+
+        quotes = quotes_future.result()
+        financials = [future.result() for future in financial_futures]
+        return self._merge_stocks_info(stock_codes, quotes, financials)
+
+    async def aget_stocks_info(self, codes_or_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """异步批量获取股票基本信息，实时行情合并为批量请求，财务指标并发请求
+
+        Args:
+            codes_or_names: 股票代码或名称列表
+
+        Returns:
+            以股票代码为键的股票基本信息字典，获取失败的股票不包含在内
+        """
+        stock_codes = self._format_stock_codes(codes_or_names)
+        if not stock_codes:
             return {}
 
+        loop = asyncio.get_running_loop()
+        quotes, *financials = await asyncio.gather(
+            loop.run_in_executor(self._pool, self.get_realtime_quotes_batch, stock_codes),
+            *(loop.run_in_executor(self._pool, self.get_financial_indicators, code) for code in stock_codes),
+        )
+        return self._merge_stocks_info(stock_codes, quotes, financials)
+
+    def _format_stock_codes(self, codes_or_names: List[str]) -> List[str]:
+        """批量格式化股票代码，跳过无效代码并去重"""
+        stock_codes = []
+        for code_or_name in codes_or_names:
+            try:
+                stock_codes.append(self._format_stock_code(code_or_name))
+            except ValueError as e:
+                logging.error("无效的股票代码或名称: %s, %s", code_or_name, e)
+        return list(dict.fromkeys(stock_codes))
+
+    def _merge_stocks_info(self, stock_codes: List[str], quotes: Dict[str, Dict[str, Any]],
+                           financials: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """合并批量获取的实时行情和财务指标，没有行情数据的股票不包含在内"""
+        return {
+            code: self._merge_stock_info(code, quotes[code], financial)
+            for code, financial in zip(stock_codes, financials)
+            if quotes.get(code)
+        }
+
+    def _merge_stock_info(self, stock_code: str, quotes: Dict[str, Any], financial: Dict[str, Any]) -> Dict[str, Any]:
+        """合并实时行情和财务指标"""
+        return {
+            "ts_code": stock_code,
+            "name": quotes.get("name", ""),
+            "price": quotes.get("price", 0.0),
+            "change_percent": quotes.get("change_percent", 0.0),
+            "pe_ttm": financial.get("pe_ttm", 0.0),
+            "pb": financial.get("pb", 0.0),
+            "total_shares": financial.get("total_share", 0.0),
+            "float_shares": financial.get("float_share", 0.0),
+            "total_assets": financial.get("total_assets", 0.0),
+            "revenue": financial.get("revenue", 0.0),
+            "net_profit": financial.get("net_profit", 0.0),
+            "roe": financial.get("roe", 0.0),
+            "debt_ratio": financial.get("debt_ratio", 0.0),
+            "gross_margin": financial.get("gross_margin", 0.0),
+            "dividend_yield": financial.get("dividend_yield", 0.0),
+            "industry": financial.get("industry", ""),
+        }
+
     def _format_stock_code(self, code: str) -> str:
         """格式化股票代码
 
@@ -113,79 +385,61 @@ class StockDataFetcher:
         Returns:
             格式化后的股票代码
         """
-        # 去除空格和点
-        code = code.strip().replace('.', '')
+        # 已是规范格式（如 sh600000）时直接返回
+        if _CANONICAL_CODE_RE.fullmatch(code):
+            return code
+        return _normalize_stock_code(code)
 
-        # 如果已经有前缀，直接返回小写形式
-        if code.lower().startswith(('sh', 'sz')):
-            return code.lower()
-
-        # 去除所有非数字字符
-        code = ''.join(filter(str.isdigit, code))
-
-        # 根据股票代码规则判断市场
-        if len(code) != 6:
-            raise ValueError("股票代码必须是6位数字")
+    def get_realtime_quotes_batch(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取实时行情数据，每 QUOTE_BATCH_SIZE 只股票合并为一次请求
 
-        # 沪市规则：
-        # - 600开头、601开头、603开头、605开头：主板
-        # - 688开头：科创板
-        # 深市规则：
-        # - 000开头：主板
-        # - 002开头：中小板
-        # - 300开头：创业板
-        # - 301开头：创业板
-        if code.startswith(('600', '601', '603', '605', '688')):
-            return f"sh{code}"
-        elif code.startswith(('000', '002', '300', '301')):
-            return f"sz{code}"
-        else:
-            raise ValueError("无效的股票代码")
-
-    def _get_realtime_quotes(self, stock_code: str) -> Dict[str, Any]:
-        """获取实时行情数据"""
-        try:
-            market = '1' if stock_code.startswith('sh') else '0'
-            code = stock_code[2:]
-            secid = f"{market}.{code}"
-
-            url = "https://push2.eastmoney.com/api/qt/stock/get"
-            params = {
-                'secid': secid,
-                'ut': 'fa5fd1943c7b386f17342da8645e8a2',
-                'fields': 'f43,f44,f45,f46,f47,f48,f49,f50,f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61,f85'
-            }
+        Args:
+            stock_codes: 股票代码列表（如：sh600000或sz000001）
 
-            data = self._make_request(url, params, timeout=5)
-            if data is None or 'data' not in data:
-                return {}
+        Returns:
+            以股票代码为键的实时行情字典，获取失败的股票不包含在内
+        """
+        # 先从缓存中取，只请求缓存中没有的股票
+        quotes = {}
+        missing = []
+        for stock_code in stock_codes:
+            quote = self._quote_cache.get(stock_code)
+            if quote is None:
+                missing.append(stock_code)
+            else:
+                quotes[stock_code] = quote
+
+        # 同一批次共用一个更新时间
+        update_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
+
+        for secids, params in quote_batches(missing):
+            try:
+                data = self._make_request(QUOTE_URL, params, timeout=5)
+                chunk_quotes = parse_quotes(data, secids, update_time)
+                if not chunk_quotes:
+                    logging.warning("未获取到实时行情数据: %s", ','.join(secids.values()))
+                for stock_code, quote in chunk_quotes.items():
+                    quotes[stock_code] = quote
+                    self._quote_cache.set(stock_code, quote)
 
-            quote_data = data['data']
-            return {
-                'name': quote_data.get('f58', ''),  # 股票名称
-                'price': quote_data.get('f43', 0),  # 最新价
-                'change_amount': quote_data.get('f44', 0),  # 涨跌额
-                'change_percent': quote_data.get('f45', 0),  # 涨跌幅
-                'volume': quote_data.get('f47', 0),  # 成交量
-                'amount': quote_data.get('f48', 0),  # 成交额
-                'amplitude': quote_data.get('f49', 0),  # 振幅
-                'high': quote_data.get('f44', 0),  # 最高
-                'low': quote_data.get('f45', 0),  # 最低
-                'open': quote_data.get('f46', 0),  # 开盘
-                'prev_close': quote_data.get('f60', 0),  # 昨收
-                'turnover': quote_data.get('f61', 0),  # 换手率
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            except Exception as e:
+                logging.error("获取实时行情失败: %s", e)
 
-        except Exception as e:
-            logging.error(f"获取实时行情失败: {str(e)}")
-            return {}
+        return quotes
 
     def get_financial_indicators(self, stock_code: str) -> Dict[str, Any]:
         """获取财务指标数据"""
+        result = self._financial_cache.get(stock_code)
+        if result is None:
+            result = self._fetch_financial_indicators(stock_code)
+            if result:
+                self._financial_cache.set(stock_code, result)
+        return result
+
+    def _fetch_financial_indicators(self, stock_code: str) -> Dict[str, Any]:
+        """请求接口获取财务指标数据，失败时返回空字典"""
         try:
             code = stock_code[2:] if stock_code.startswith(("sh", "sz")) else stock_code
-            url = f"https://datacenter-web.eastmoney.com/api/data/v1/get"
             params = {
                 'sortColumns': 'REPORT_DATE',
                 'sortTypes': '-1',
@@ -196,9 +450,9 @@ class StockDataFetcher:
                 'filter': f"(SECURITY_CODE='{code}')"
             }
 
-            data = self._make_request(url, params, timeout=10)
+            data = self._make_request(self._FINANCIAL_URL, params, timeout=10)
             if data is None or not data.get("result") or not data["result"].get("data"):
-                logging.warning(f"未找到{stock_code}的财务指标数据")
+                logging.warning("未找到%s的财务指标数据", stock_code)
                 return {}
 
             financial_data = data["result"]["data"][0]
@@ -219,125 +473,193 @@ class StockDataFetcher:
             }
 
         except Exception as e:
-            logging.error(f"获取财务指标失败: {str(e)}")
+            logging.error("获取财务指标失败: %s", e)
             return {}
 
     def get_technical_indicators(self, stock_code: str) -> Dict[str, Any]:
         """获取技术指标数据"""
         try:
-            # 获取K线数据
-            df = self._get_kline_data(stock_code, period='daily', limit=200)
+            # 指标只需要最新值，最近120根K线足以让EMA收敛，不必多请求
+            df = self._get_kline_data(stock_code, period='daily', limit=120)
             if df is None or len(df) < 20:  # 确保有足够的数据计算指标
                 return {}
 
-            # 计算技术指标
-            indicators = {}
-
-            # 计算MACD
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            df['MACD_DIF'] = exp1 - exp2
-            df['MACD_DEA'] = df['MACD_DIF'].ewm(span=9, adjust=False).mean()
-            df['MACD'] = (df['MACD_DIF'] - df['MACD_DEA']) * 2
-
-            # 计算KDJ
-            low_9 = df['low'].rolling(window=9).min()
-            high_9 = df['high'].rolling(window=9).max()
-            df['RSV'] = (df['close'] - low_9) / (high_9 - low_9) * 100
-            df['K'] = df['RSV'].ewm(com=2).mean()
-            df['D'] = df['K'].ewm(com=2).mean()
-            df['J'] = 3 * df['K'] - 2 * df['D']
-
-            # 计算RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
-
-            # 获取最新的技术指标
-            latest = df.iloc[-1]
+            # float32 减少内存带宽
+            close = df['close'].to_numpy(np.float32)
+            dif, dea, macd_now, macd_prev, k, d, j_now, rsi_now = compute_indicators(
+                close,
+                df['high'].to_numpy(np.float32),
+                df['low'].to_numpy(np.float32),
+            )
+
+            # 获取最新的技术指标，只在输出时取整
             indicators = {
                 'MACD': {
-                    'DIF': round(latest['MACD_DIF'], 3),
-                    'DEA': round(latest['MACD_DEA'], 3),
-                    'MACD': round(latest['MACD'], 3),
-                    'trend': '金叉' if latest['MACD'] > 0 and df.iloc[-2]['MACD'] < 0 else
-                             '死叉' if latest['MACD'] < 0 and df.iloc[-2]['MACD'] > 0 else
-                             '上升' if latest['MACD'] > 0 else '下降'
+                    'DIF': round(float(dif), 3),
+                    'DEA': round(float(dea), 3),
+                    'MACD': round(float(macd_now), 3),
+                    'trend': '金叉' if macd_now > 0 and macd_prev < 0 else
+                             '死叉' if macd_now < 0 and macd_prev > 0 else
+                             '上升' if macd_now > 0 else '下降'
                 },
                 'KDJ': {
-                    'K': round(latest['K'], 2),
-                    'D': round(latest['D'], 2),
-                    'J': round(latest['J'], 2),
-                    'trend': '超买' if latest['J'] > 80 else '超卖' if latest['J'] < 20 else '中性'
+                    'K': round(float(k), 2),
+                    'D': round(float(d), 2),
+                    'J': round(float(j_now), 2),
+                    'trend': '超买' if j_now > 80 else '超卖' if j_now < 20 else '中性'
                 },
                 'RSI': {
-                    'RSI': round(latest['RSI'], 2),
-                    'trend': '超买' if latest['RSI'] > 70 else '超卖' if latest['RSI'] < 30 else '中性'
+                    'RSI': round(float(rsi_now), 2),
+                    'trend': '超买' if rsi_now > 70 else '超卖' if rsi_now < 30 else '中性'
                 },
+                # 价格类字段为 float32，取整到接口返回的两位小数，去掉 float32 的表示误差
                 'price_data': {
-                    'current': latest['close'],
-                    'change_percent': latest['change_percent'],
-                    'amplitude': latest['amplitude'],
-                    'volume': latest['volume'],
-                    'turnover': latest['turnover']
+                    'current': round(float(close[-1]), 2),
+                    'change_percent': round(float(df['change_percent'].to_numpy()[-1]), 2),
+                    'amplitude': round(float(df['amplitude'].to_numpy()[-1]), 2),
+                    'volume': float(df['volume'].to_numpy()[-1]),
+                    'turnover': round(float(df['turnover'].to_numpy()[-1]), 2)
                 }
             }
 
             return indicators
 
         except Exception as e:
-            logging.error(f"计算技术指标失败: {str(e)}")
+            logging.error("计算技术指标失败: %s", e)
             return {}
 
     def _get_kline_data(self, stock_code: str, period: str = 'daily', limit: int = 100) -> Optional[pd.DataFrame]:
-        """获取K线数据"""
-        try:
-            market = '1' if stock_code.startswith('sh') else '0'
-            code = stock_code[2:]
-            secid = f"{market}.{code}"
-
-            period_map = {'daily': '101', 'weekly': '102', 'monthly': '103'}
-            klt = period_map.get(period, '101')
+        """获取K线数据
 
-            url = f"https://push2his.eastmoney.com/api/qt/stock/kline/get"
+        已获取的K线缓存在本地，每次只请求缓存之后缺失的部分。前复权价格在分红、送转后会整体调整，
+        增量数据与缓存重叠部分的价格不一致时，说明复权基准已变化，重新请求全部K线。
+        """
+        cache_key = FileCache.make_key(stock_code, period)
+        cached = self._load_kline_cache(cache_key)
+
+        fetch_limit = limit
+        if cached is not None and len(cached) >= limit:
+            last_date = pd.to_datetime(cached['date'].iloc[-1])
+            # 多取两根K线覆盖最后一根（可能是盘中未完成的K线）及其前一根，用于校验
+            fetch_limit = min(limit, (pd.Timestamp.today().normalize() - last_date.normalize()).days + 2)
+
+        df = self._fetch_kline_data(stock_code, period, fetch_limit)
+        if df is None:
+            return cached.tail(limit).reset_index(drop=True) if cached is not None else None
+
+        if cached is not None and fetch_limit < limit:
+            if self._kline_overlap_matches(cached, df):
+                df = pd.concat([cached, df]).drop_duplicates(subset='date', keep='last')
+            else:
+                logging.info("K线复权价格已调整，重新获取全部K线: %s", stock_code)
+                df = self._fetch_kline_data(stock_code, period, limit)
+                if df is None:
+                    return None
+        df = df.tail(limit).reset_index(drop=True)
+        self._save_kline_cache(cache_key, df)
+        return df
+
+    @staticmethod
+    def _kline_overlap_matches(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        """检查新获取的K线与缓存中同一日期的K线价格是否一致
+
+        缓存的最后一根K线可能是盘中未完成的，不参与比较；没有可比较的K线时视为不一致。
+        """
+        history = cached.iloc[:-1].set_index('date')[KLINE_PRICE_COLUMNS]
+        fresh = fresh.set_index('date')[KLINE_PRICE_COLUMNS]
+        common = history.index.intersection(fresh.index)
+        if common.empty:
+            return False
+        return np.allclose(history.loc[common].to_numpy(), fresh.loc[common].to_numpy(),
+                           rtol=1e-6, equal_nan=True)
+
+    def _load_kline_cache(self, key: str) -> Optional[pd.DataFrame]:
+        """读取本地K线缓存，缓存按列保存为JSON"""
+        data = self._kline_cache.get(key)
+        if not data:
+            return None
+        try:
+            df = pd.DataFrame({name: data[name] for name in KLINE_COLUMNS}).astype(KLINE_DTYPES)
+            df['date'] = pd.to_datetime(df['date'])
+            return df
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning("读取K线缓存失败: %s, %s", key, e)
+            return None
+
+    def _save_kline_cache(self, key: str, df: pd.DataFrame) -> None:
+        """写入本地K线缓存"""
+        data = {name: df[name].tolist() for name in KLINE_COLUMNS[1:]}
+        data['date'] = df['date'].dt.strftime('%Y-%m-%d').tolist()
+        self._kline_cache.set(key, data)
+
+    def _fetch_kline_data(self, stock_code: str, period: str, limit: int) -> Optional[pd.DataFrame]:
+        """从东方财富请求K线数据"""
+        try:
             params = {
-                'secid': secid,
-                'ut': 'fa5fd1943c7b386f17342da8645e8a2',
-                'fields1': 'f1,f2,f3,f4,f5,f6',
-                'fields2': 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61',
-                'klt': klt,
+                'secid': to_secid(stock_code),
+                'ut': EASTMONEY_UT,
+                'fields1': self._KLINE_FIELDS1,
+                'fields2': self._KLINE_FIELDS2,
+                'klt': self._PERIOD_MAP.get(period, '101'),
                 'fqt': '1',  # 1：前复权，2：后复权，0：不复权
                 'end': '20500101',
                 'lmt': limit,
             }
 
-            data = self._make_request(url, params, timeout=10)
+            data = self._make_request(self._KLINE_URL, params, timeout=10)
             if data is None or data['data'] is None or data['data']['klines'] is None:
-                logging.warning(f"未获取到{stock_code}的K线数据")
+                logging.warning("未获取到%s的K线数据", stock_code)
                 return None
 
-            # 解析K线数据
-            klines = []
-            for line in data['data']['klines']:
-                items = line.split(',')
-                klines.append({
-                    'date': items[0],
-                    'open': float(items[1]),
-                    'close': float(items[2]),
-                    'high': float(items[3]),
-                    'low': float(items[4]),
-                    'volume': float(items[5]),
-                    'amount': float(items[6]),
-                    'amplitude': float(items[7]),
-                    'change_percent': float(items[8]),
-                    'change_amount': float(items[9]),
-                    'turnover': float(items[10])
-                })
-
-            return pd.DataFrame(klines)
+            klines = data['data']['klines']
+            if not klines:
+                logging.warning("未获取到%s的K线数据", stock_code)
+                return None
+
+            # K线数据本身是CSV格式，直接交给pandas的C解析器
+            try:
+                return pd.read_csv(
+                    StringIO("\n".join(klines)),
+                    header=None,
+                    names=KLINE_COLUMNS,
+                    dtype=KLINE_DTYPES,
+                    parse_dates=['date'],
+                    engine='c',
+                )
+            except ValueError as e:
+                logging.warning("K线数据格式异常，改为逐行解析: %s, %s", stock_code, e)
+                return self._parse_klines(klines)
 
         except Exception as e:
-            logging.error(f"获取K线数据失败: {str(e)}")
-            return None
\ No newline at end of file
+            logging.error("获取K线数据失败: %s", e)
+            return None
+
+    def _parse_klines(self, klines: List[str]) -> Optional[pd.DataFrame]:
+        """逐行解析K线数据，跳过格式错误的行
+
+        按列预分配数组并逐行填充，避免为每行构造字典。
+        """
+        n = len(klines)
+        dates = np.empty(n, dtype='U10')
+        columns = {name: np.empty(n, dtype=KLINE_DTYPES[name]) for name in KLINE_COLUMNS[1:]}
+
+        rows = 0
+        for line in klines:
+            items = line.split(',')
+            if len(items) < len(KLINE_COLUMNS):
+                continue
+            try:
+                values = [float(item) for item in items[1:len(KLINE_COLUMNS)]]
+            except ValueError:
+                continue
+            dates[rows] = items[0]
+            for array, value in zip(columns.values(), values):
+                array[rows] = value
+            rows += 1
+
+        if rows == 0:
+            return None
+
+        data = {'date': pd.to_datetime(dates[:rows])}
+        data.update((name, array[:rows]) for name, array in columns.items())
+        return pd.DataFrame(data, copy=False)
\ No newline at end of file
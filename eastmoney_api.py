@@ -1,14 +1,67 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import concurrent.futures
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Optional
 import logging
 from datetime import datetime, timedelta
 import time
-import random
+from io import StringIO
+import os
+
+from cache import FileCache, TTLCache, _json_loads
+from eastmoney_common import EASTMONEY_UT, QUOTE_URL, parse_quotes, quote_batches, to_secid
+from kernels import compute_all_indicators
+
+# 接口响应的本地缓存目录及各接口的缓存有效期（秒）
+CACHE_DIR = os.path.join("cache", "eastmoney")
+KLINE_CACHE_TTL = 6 * 3600
+QUOTE_CACHE_TTL = 5
+FINANCIAL_CACHE_TTL = 24 * 3600
+INDUSTRY_CACHE_TTL = 30 * 24 * 3600
+
+# K线字段及类型，顺序与接口 fields2 一致
+KLINE_DTYPE = np.dtype([
+    ('date', 'U10'), ('open', 'f8'), ('close', 'f8'), ('high', 'f8'), ('low', 'f8'),
+    ('volume', 'f8'), ('amount', 'f8'), ('amplitude', 'f8'),
+    ('change_percent', 'f8'), ('change_amount', 'f8'), ('turnover', 'f8'),
+])
+KLINE_COLUMNS = list(KLINE_DTYPE.names)
+# 接口返回*100后数值的字段
+KLINE_SCALED_COLUMNS = ['open', 'close', 'high', 'low',
+                        'amplitude', 'change_percent', 'change_amount', 'turnover']
+# 生成模拟数据用的随机数生成器
+_RNG = np.random.default_rng()
+
 
 class EastMoneyAPI:
+    # 模拟财务数据的取值范围：(字段, 下限, 上限)
+    _DUMMY_FINANCIAL_RANGES = (
+        ('pe_ttm', 10, 30),  # 合理的市盈率范围
+        ('pb', 1, 4),  # 合理的市净率范围
+        ('roe', 5, 25),  # 合理的净资产收益率范围
+        ('debt_ratio', 30, 60),  # 合理的资产负债率范围
+        ('gross_margin', 20, 40),  # 合理的毛利率范围
+        ('net_profit_margin', 5, 20),  # 合理的净利润率范围
+        ('total_assets', 1e9, 1e11),  # 总资产(十亿到千亿)
+        ('revenue', 1e8, 1e10),  # 营业收入(亿到百亿)
+        ('net_profit', 1e7, 1e9),  # 净利润(千万到十亿)
+        ('total_share', 1e8, 1e9),  # 总股本(亿到十亿)
+        ('float_share', 5e7, 8e8),  # 流通股本(5000万到8亿)
+        ('dividend_yield', 0.5, 3),  # 股息率
+        ('profit_growth', 5, 30),  # 利润增长率
+        ('revenue_growth', 3, 20),  # 收入增长率
+    )
+    _DUMMY_FINANCIAL_KEYS = [key for key, _, _ in _DUMMY_FINANCIAL_RANGES]
+    _DUMMY_FINANCIAL_LOWS = np.array([low for _, low, _ in _DUMMY_FINANCIAL_RANGES])
+    _DUMMY_FINANCIAL_HIGHS = np.array([high for _, _, high in _DUMMY_FINANCIAL_RANGES])
+
     def __init__(self):
         """初始化东方财富API客户端"""
         self.headers = {
@@ -16,8 +69,63 @@ class EastMoneyAPI:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
             'Connection': 'keep-alive',
+            # 只声明本地能解压的编码（安装了brotli时包含br）
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
         }
         self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # 复用长连接，批量扫描大量股票时避免每次请求重新握手；重试由调用方负责
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=0))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # 异步接口在线程池中执行同步请求
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=16)
+        # 实时行情只在内存中短暂缓存，其他接口的响应持久化到本地
+        self._memory_cache = TTLCache(maxsize=4096, ttl=QUOTE_CACHE_TTL)
+        self._file_cache = FileCache(CACHE_DIR)
+
+    def _get_json(self, url: str, params: Dict[str, Any], ttl: float,
+                  field: Optional[str] = None) -> Any:
+        """请求接口并返回解析后的JSON，命中缓存时不发送请求；HTTP错误状态抛出 requests.HTTPError
+
+        Args:
+            url: 接口地址
+            params: 请求参数
+            ttl: 缓存有效期（秒）
+            field: 响应中该字段为空时视为无数据，不写入缓存
+        """
+        key = FileCache.make_key(url, params)
+        data = self._file_cache.get(key)
+        if data is not None:
+            return data
+
+        response = self.session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        data = _json_loads(response.content)
+        if isinstance(data, dict) and (field is None or data.get(field)):
+            self._file_cache.set(key, data, ttl)
+        return data
+
+    async def _run_in_pool(self, func, *args):
+        """在线程池中执行同步方法，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    async def aget_kline_data(self, stock_code: str, period: str = 'daily', limit: int = 100) -> Optional[pd.DataFrame]:
+        """异步获取K线数据，参数同 get_kline_data"""
+        return await self._run_in_pool(self.get_kline_data, stock_code, period, limit)
+
+    async def aget_technical_indicators(self, stock_code: str) -> Dict[str, Any]:
+        """异步获取技术指标数据，可用 asyncio.gather 同时获取多只股票"""
+        return await self._run_in_pool(self.get_technical_indicators, stock_code)
+
+    async def aget_realtime_quotes(self, stock_code: str) -> Dict[str, Any]:
+        """异步获取实时行情数据"""
+        return await self._run_in_pool(self.get_realtime_quotes, stock_code)
+
+    async def aget_financial_indicators(self, stock_code: str) -> Dict[str, Any]:
+        """异步获取财务指标数据"""
+        return await self._run_in_pool(self.get_financial_indicators, stock_code)
         
     def get_kline_data(self, stock_code: str, period: str = 'daily', limit: int = 100) -> Optional[pd.DataFrame]:
         """
@@ -41,13 +149,11 @@ class EastMoneyAPI:
             - change_percent: 涨跌幅
             - change_amount: 涨跌额
             - turnover: 换手率
+
+        Raises:
+            requests.RequestException: 网络请求失败，由调用方决定是否重试
         """
         try:
-            # 转换股票代码格式
-            market = '1' if stock_code.startswith('sh') else '0'
-            code = stock_code[2:]
-            secid = f"{market}.{code}"
-            
             # 转换周期代码
             period_map = {'daily': '101', 'weekly': '102', 'monthly': '103'}
             klt = period_map.get(period, '101')
@@ -55,8 +161,8 @@ class EastMoneyAPI:
             # 构建请求URL
             url = "https://push2his.eastmoney.com/api/qt/stock/kline/get"
             params = {
-                'secid': secid,
-                'ut': 'fa5fd1943c7b386f17342da8645e8a2',
+                'secid': to_secid(stock_code),
+                'ut': EASTMONEY_UT,
                 'fields1': 'f1,f2,f3,f4,f5,f6',
                 'fields2': 'f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61',
                 'klt': klt,
@@ -65,51 +171,62 @@ class EastMoneyAPI:
                 'lmt': limit,
             }
             
-            response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-            data = response.json()
+            data = self._get_json(url, params, KLINE_CACHE_TTL, field='data')
             
             if not data.get('data') or not data['data'].get('klines'):
                 logging.warning(f"未获取到{stock_code}的K线数据")
                 return None
                 
-            # 解析K线数据
-            klines = []
-            for line in data['data']['klines']:
-                try:
-                    items = line.split(',')
-                    if len(items) < 11:
-                        continue
-                        
-                    # 东方财富API返回的价格是*100后的数值，需要除以100
-                    klines.append({
-                        'date': items[0],
-                        'open': float(items[1]) / 100 if items[1] else 0,
-                        'close': float(items[2]) / 100 if items[2] else 0,
-                        'high': float(items[3]) / 100 if items[3] else 0,
-                        'low': float(items[4]) / 100 if items[4] else 0,
-                        'volume': float(items[5]) if items[5] else 0,
-                        'amount': float(items[6]) if items[6] else 0,
-                        'amplitude': float(items[7]) / 100 if items[7] else 0,
-                        'change_percent': float(items[8]) / 100 if items[8] else 0,
-                        'change_amount': float(items[9]) / 100 if items[9] else 0,
-                        'turnover': float(items[10]) / 100 if items[10] else 0
-                    })
-                except (ValueError, IndexError) as e:
-                    logging.warning(f"解析K线数据行失败: {line}, 错误: {str(e)}")
-                    continue
-            
+            # 字段不足的行直接跳过
+            klines = [line for line in data['data']['klines'] if line.count(',') >= 10]
             if not klines:
                 logging.warning(f"解析K线数据失败，未获取到有效数据: {stock_code}")
                 return None
-                
-            return pd.DataFrame(klines)
+
+            # K线数据本身是CSV格式，直接交给pandas的C解析器
+            try:
+                df = pd.read_csv(
+                    StringIO("\n".join(klines)),
+                    header=None,
+                    names=KLINE_COLUMNS,
+                    usecols=range(len(KLINE_COLUMNS)),
+                    dtype={'date': str, **dict.fromkeys(KLINE_COLUMNS[1:], 'float64')},
+                    engine='c',
+                )
+            except ValueError as e:
+                logging.warning(f"K线数据格式异常，改为逐行解析: {stock_code}, 错误: {str(e)}")
+                df = self._parse_klines(klines)
+                if df is None:
+                    logging.warning(f"解析K线数据失败，未获取到有效数据: {stock_code}")
+                    return None
+            df.fillna(0, inplace=True)
+            # 东方财富API返回的价格是*100后的数值，需要除以100
+            df[KLINE_SCALED_COLUMNS] /= 100.0
+            return df
             
+        except requests.RequestException:
+            raise
         except Exception as e:
-            logging.error(f"获取K线数据失败: {str(e)}")
-            import traceback
-            logging.error(traceback.format_exc())
+            logging.exception(f"获取K线数据失败: {str(e)}")
             return None
             
+    def _parse_klines(self, klines: List[str]) -> Optional[pd.DataFrame]:
+        """逐行解析K线数据，跳过无法解析的行"""
+        records = np.empty(len(klines), dtype=KLINE_DTYPE)
+        rows = 0
+        for line in klines:
+            items = line.split(',')
+            try:
+                records[rows] = (items[0], *(float(item) if item else np.nan for item in items[1:len(KLINE_COLUMNS)]))
+            except ValueError as e:
+                logging.warning(f"解析K线数据行失败: {line}, 错误: {str(e)}")
+                continue
+            rows += 1
+
+        if rows == 0:
+            return None
+        return pd.DataFrame.from_records(records[:rows])
+
     def get_technical_indicators(self, stock_code: str) -> Dict[str, Any]:
         """
         获取技术指标数据
@@ -125,6 +242,9 @@ class EastMoneyAPI:
             - BOLL
             - MA
             - VOL
+
+        Raises:
+            requests.RequestException: 获取K线数据的网络请求失败
         """
         try:
             # 获取日K数据
@@ -133,127 +253,113 @@ class EastMoneyAPI:
                 logging.warning(f"获取K线数据失败或数据不足，无法计算技术指标: {stock_code}")
                 return {}
             
-            # 将日期列设置为索引并按日期排序
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values(by='date')
-                
-            # 计算技术指标
-            indicators = {}
-            
-            # 计算MACD
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            df['MACD_DIF'] = exp1 - exp2
-            df['MACD_DEA'] = df['MACD_DIF'].ewm(span=9, adjust=False).mean()
-            df['MACD'] = (df['MACD_DIF'] - df['MACD_DEA']) * 2
-            
-            # 计算KDJ
-            low_9 = df['low'].rolling(window=9).min()
-            high_9 = df['high'].rolling(window=9).max()
-            df['RSV'] = (df['close'] - low_9) / (high_9 - low_9 + 0.000001) * 100  # 避免除零错误
-            df['K'] = df['RSV'].ewm(alpha=1/3, adjust=False).mean()
-            df['D'] = df['K'].ewm(alpha=1/3, adjust=False).mean()
-            df['J'] = 3 * df['K'] - 2 * df['D']
-            
-            # 计算RSI
-            delta = df['close'].diff()
-            gain = delta.where(delta > 0, 0).fillna(0)
-            loss = -delta.where(delta < 0, 0).fillna(0)
-            avg_gain = gain.rolling(window=14).mean()
-            avg_loss = loss.rolling(window=14).mean()
-            rs = avg_gain / (avg_loss + 0.000001)  # 避免除零错误
-            df['RSI'] = 100 - (100 / (1 + rs))
-            
-            # 计算BOLL
-            df['MA20'] = df['close'].rolling(window=20).mean()
-            df['STD20'] = df['close'].rolling(window=20).std()
-            df['BOLL_UPPER'] = df['MA20'] + 2 * df['STD20']
-            df['BOLL_LOWER'] = df['MA20'] - 2 * df['STD20']
-            
-            # 计算MA - 移动平均线
-            df['MA5'] = df['close'].rolling(window=5).mean()
-            df['MA10'] = df['close'].rolling(window=10).mean()
-            df['MA30'] = df['close'].rolling(window=30).mean()
-            df['MA60'] = df['close'].rolling(window=60).mean()
-            
-            # 计算成交量指标
-            df['V_MA5'] = df['volume'].rolling(window=5).mean()
-            df['V_MA10'] = df['volume'].rolling(window=10).mean()
-            
-            # 处理NaN值
-            df = df.fillna(0)
-            
-            # 获取最新的技术指标
-            if len(df) > 0:
-                latest = df.iloc[-1]
-                prev = df.iloc[-2] if len(df) > 1 else latest
+            # 接口返回的K线已按日期升序排列，只有顺序不对时才排序；
+            # 日期格式为 YYYY-MM-DD，按字符串比较即可，无需转换为日期类型
+            dates = df['date']
+            if not dates.is_monotonic_increasing:
+                if dates.is_monotonic_decreasing:
+                    df = df.iloc[::-1]
+                else:
+                    df = df.iloc[np.argsort(dates.to_numpy(), kind='stable')]
                 
-                # MACD金叉死叉判断
-                macd_trend = '金叉' if latest['MACD'] > 0 and prev['MACD'] < 0 else \
-                           '死叉' if latest['MACD'] < 0 and prev['MACD'] > 0 else \
-                           '上升' if latest['MACD'] > 0 else '下降'
-                
-                # KDJ超买超卖判断
-                kdj_trend = '超买' if latest['J'] > 80 else '超卖' if latest['J'] < 20 else '中性'
-                
-                # RSI超买超卖判断
-                rsi_trend = '超买' if latest['RSI'] > 70 else '超卖' if latest['RSI'] < 30 else '中性'
-                
-                # BOLL带趋势判断
-                boll_trend = '突破上轨' if latest['close'] > latest['BOLL_UPPER'] else \
-                           '突破下轨' if latest['close'] < latest['BOLL_LOWER'] else \
-                           '上轨靠近' if latest['close'] > latest['MA20'] else '下轨靠近'
-                
-                # 趋势判断
-                price_trend = '上涨' if latest['close'] > latest['MA30'] else '下跌'
-                
-                indicators = {
-                    'MACD': {
-                        'DIF': round(float(latest['MACD_DIF']), 3),
-                        'DEA': round(float(latest['MACD_DEA']), 3),
-                        'MACD': round(float(latest['MACD']), 3),
-                        'trend': macd_trend
-                    },
-                    'KDJ': {
-                        'K': round(float(latest['K']), 2),
-                        'D': round(float(latest['D']), 2),
-                        'J': round(float(latest['J']), 2),
-                        'trend': kdj_trend
-                    },
-                    'RSI': {
-                        'RSI': round(float(latest['RSI']), 2),
-                        'trend': rsi_trend
-                    },
-                    'BOLL': {
-                        'UPPER': round(float(latest['BOLL_UPPER']), 2),
-                        'MID': round(float(latest['MA20']), 2),
-                        'LOWER': round(float(latest['BOLL_LOWER']), 2),
-                        'trend': boll_trend
-                    },
-                    'MA': {
-                        'MA5': round(float(latest['MA5']), 2),
-                        'MA10': round(float(latest['MA10']), 2),
-                        'MA30': round(float(latest['MA30']), 2),
-                        'MA60': round(float(latest['MA60']), 2),
-                        'trend': price_trend
-                    },
-                    'price_data': {
-                        'current': float(latest['close']),
-                        'change_percent': float(latest['change_percent']),
-                        'amplitude': float(latest['amplitude']),
-                        'volume': float(latest['volume']),
-                        'turnover': float(latest['turnover'])
-                    }
+            # 只需要最新一根K线的指标，在编译后的函数中一次算出
+            close = df['close'].to_numpy(np.float64)
+            (dif, dea, macd, macd_prev, k, d, j, rsi,
+             ma20, boll_upper, boll_lower, ma5, ma10, ma30, ma60) = compute_all_indicators(
+                close,
+                df['high'].to_numpy(np.float64),
+                df['low'].to_numpy(np.float64),
+            )
+            latest_close = close[-1]
+
+            # MACD金叉死叉判断
+            macd_trend = '金叉' if macd > 0 and macd_prev < 0 else \
+                       '死叉' if macd < 0 and macd_prev > 0 else \
+                       '上升' if macd > 0 else '下降'
+
+            # KDJ超买超卖判断
+            kdj_trend = '超买' if j > 80 else '超卖' if j < 20 else '中性'
+
+            # RSI超买超卖判断
+            rsi_trend = '超买' if rsi > 70 else '超卖' if rsi < 30 else '中性'
+
+            # BOLL带趋势判断
+            boll_trend = '突破上轨' if latest_close > boll_upper else \
+                       '突破下轨' if latest_close < boll_lower else \
+                       '上轨靠近' if latest_close > ma20 else '下轨靠近'
+
+            # 趋势判断
+            price_trend = '上涨' if latest_close > ma30 else '下跌'
+
+            indicators = {
+                'MACD': {
+                    'DIF': round(float(dif), 3),
+                    'DEA': round(float(dea), 3),
+                    'MACD': round(float(macd), 3),
+                    'trend': macd_trend
+                },
+                'KDJ': {
+                    'K': round(float(k), 2),
+                    'D': round(float(d), 2),
+                    'J': round(float(j), 2),
+                    'trend': kdj_trend
+                },
+                'RSI': {
+                    'RSI': round(float(rsi), 2),
+                    'trend': rsi_trend
+                },
+                'BOLL': {
+                    'UPPER': round(float(boll_upper), 2),
+                    'MID': round(float(ma20), 2),
+                    'LOWER': round(float(boll_lower), 2),
+                    'trend': boll_trend
+                },
+                'MA': {
+                    'MA5': round(float(ma5), 2),
+                    'MA10': round(float(ma10), 2),
+                    'MA30': round(float(ma30), 2),
+                    'MA60': round(float(ma60), 2),
+                    'trend': price_trend
+                },
+                'price_data': {
+                    'current': float(latest_close),
+                    'change_percent': float(df['change_percent'].iat[-1]),
+                    'amplitude': float(df['amplitude'].iat[-1]),
+                    'volume': float(df['volume'].iat[-1]),
+                    'turnover': float(df['turnover'].iat[-1])
                 }
-            
+            }
+
             return indicators
             
+        except requests.RequestException:
+            raise
         except Exception as e:
-            logging.error(f"计算技术指标失败: {str(e)}")
-            import traceback
-            logging.error(traceback.format_exc())
+            logging.exception(f"计算技术指标失败: {str(e)}")
             return {}
             
+    def get_technical_indicators_batch(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取技术指标数据，K线请求和指标计算在线程池中并发执行
+
+        Args:
+            stock_codes: 股票代码列表（如：sh600000或sz000001）
+
+        Returns:
+            以股票代码为键的技术指标字典，获取失败（包括网络请求失败）的股票不包含在内
+        """
+        stock_codes = list(dict.fromkeys(stock_codes))
+        results = self._pool.map(self._technical_indicators_or_empty, stock_codes)
+        return {code: indicators for code, indicators in zip(stock_codes, results) if indicators}
+
+    def _technical_indicators_or_empty(self, stock_code: str) -> Dict[str, Any]:
+        """批量获取时单只股票的网络请求失败不影响其他股票，记录日志后返回空字典"""
+        try:
+            return self.get_technical_indicators(stock_code)
+        except requests.RequestException as e:
+            logging.error(f"获取{stock_code}的技术指标失败: {str(e)}")
+            return {}
+
     def get_realtime_quotes(self, stock_code: str) -> Dict[str, Any]:
         """
         获取实时行情数据
@@ -263,64 +369,55 @@ class EastMoneyAPI:
             
         Returns:
             实时行情数据字典
+
+        Raises:
+            requests.RequestException: 网络请求失败
         """
-        try:
-            market = '1' if stock_code.startswith('sh') else '0'
-            code = stock_code[2:]
-            secid = f"{market}.{code}"
-            
-            url = "https://push2.eastmoney.com/api/qt/stock/get"
-            params = {
-                'secid': secid,
-                'ut': 'fa5fd1943c7b386f17342da8645e8a2',
-                'fields': 'f43,f44,f45,f46,f47,f48,f49,f50,f51,f52,f53,f54,f55,f56,f57,f58,f59,f60,f61,f85,f86,f87,f88,f89,f90,f91,f92,f107,f111,f116,f117,f162,f167,f168,f169'
-            }
-            
-            response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-            data = response.json()
-            
-            if 'data' not in data:
-                return {}
-                
-            quote_data = data['data']
-            
-            # 东方财富API返回的价格是*100后的数值，需要除以100
-            price = quote_data.get('f43', 0)
-            change_amount = quote_data.get('f44', 0)
-            change_percent = quote_data.get('f45', 0)
-            open_price = quote_data.get('f46', 0)
-            high_price = quote_data.get('f44', 0)
-            low_price = quote_data.get('f45', 0)
-            prev_close = quote_data.get('f60', 0)
-            
-            # 处理价格数据，将*100的价格转换回实际价格
-            price = price / 100 if price else 0
-            change_amount = change_amount / 100 if change_amount else 0
-            change_percent = change_percent / 100 if change_percent else 0
-            open_price = open_price / 100 if open_price else 0
-            high_price = high_price / 100 if high_price else 0
-            low_price = low_price / 100 if low_price else 0
-            prev_close = prev_close / 100 if prev_close else 0
-                
-            return {
-                'name': quote_data.get('f58', ''),  # 股票名称
-                'price': price,  # 最新价
-                'change_amount': change_amount,  # 涨跌额
-                'change_percent': change_percent,  # 涨跌幅
-                'volume': quote_data.get('f47', 0),  # 成交量
-                'amount': quote_data.get('f48', 0),  # 成交额
-                'amplitude': quote_data.get('f49', 0) / 100 if quote_data.get('f49') else 0,  # 振幅
-                'high': high_price,  # 最高
-                'low': low_price,  # 最低
-                'open': open_price,  # 开盘
-                'prev_close': prev_close,  # 昨收
-                'turnover': quote_data.get('f61', 0) / 100 if quote_data.get('f61') else 0,  # 换手率
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-        except Exception as e:
-            logging.error(f"获取实时行情失败: {str(e)}")
-            return {}
+        return self.get_realtime_quotes_batch([stock_code]).get(stock_code, {})
+
+    def get_realtime_quotes_batch(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取实时行情数据，每 QUOTE_BATCH_SIZE 只股票合并为一次请求
+
+        Args:
+            stock_codes: 股票代码列表（如：sh600000或sz000001）
+
+        Returns:
+            以股票代码为键的实时行情字典，获取失败的股票不包含在内
+
+        Raises:
+            requests.RequestException: 网络请求失败；已获取的批次已写入缓存，重试时不再请求
+        """
+        # 先从缓存中取，只请求缓存中没有的股票
+        quotes = {}
+        missing = []
+        for stock_code in stock_codes:
+            quote = self._memory_cache.get(('quote', stock_code))
+            if quote is None:
+                missing.append(stock_code)
+            else:
+                quotes[stock_code] = quote
+
+        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for secids, params in quote_batches(missing):
+            try:
+                response = self.session.get(QUOTE_URL, params=params, timeout=10)
+                response.raise_for_status()
+                chunk_quotes = parse_quotes(_json_loads(response.content), secids, update_time)
+                if not chunk_quotes:
+                    logging.warning(f"未获取到实时行情数据: {','.join(secids.values())}")
+                    continue
+
+                for stock_code, quote in chunk_quotes.items():
+                    quotes[stock_code] = quote
+                    self._memory_cache.set(('quote', stock_code), quote)
+
+            except requests.RequestException:
+                raise
+            except Exception as e:
+                logging.error(f"获取实时行情失败: {str(e)}")
+
+        return quotes
             
     def get_financial_indicators(self, stock_code: str) -> Dict[str, Any]:
         """
@@ -331,6 +428,9 @@ class EastMoneyAPI:
             
         Returns:
             包含财务指标的字典
+
+        Raises:
+            requests.RequestException: 备用API的网络请求失败（主要API失败时会改用备用API）
         """
         try:
             # 移除市场前缀，只保留数字部分
@@ -345,8 +445,7 @@ class EastMoneyAPI:
             }
             
             try:
-                response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-                data = response.json()
+                data = self._get_json(url, params, FINANCIAL_CACHE_TTL, field='data')
                 
                 if data and 'data' in data and len(data['data']) > 0:
                     financial_data = data['data'][0]
@@ -366,8 +465,7 @@ class EastMoneyAPI:
                 'filter': f"(SECURITY_CODE=\"{code}\")"
             }
             
-            response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-            data = response.json()
+            data = self._get_json(url, params, FINANCIAL_CACHE_TTL, field='result')
             
             if not data.get("result") or not data["result"].get("data") or len(data["result"]["data"]) == 0:
                 # 3. 尝试第三种API，使用市场代码
@@ -375,8 +473,7 @@ class EastMoneyAPI:
                 new_code = f"{market}{code}"
                 params['filter'] = f"(SECURITY_CODE=\"{new_code}\")"
                 
-                response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-                data = response.json()
+                data = self._get_json(url, params, FINANCIAL_CACHE_TTL, field='result')
                 
                 if not data.get("result") or not data["result"].get("data") or len(data["result"]["data"]) == 0:
                     logging.warning(f"未找到{stock_code}的财务指标数据，生成模拟数据")
@@ -393,6 +490,8 @@ class EastMoneyAPI:
                 
             return result
             
+        except requests.RequestException:
+            raise
         except Exception as e:
             logging.error(f"获取财务指标失败: {str(e)}")
             return self._generate_dummy_financial_data(stock_code)
@@ -409,8 +508,6 @@ class EastMoneyAPI:
         
     def _generate_dummy_financial_data(self, stock_code: str) -> Dict[str, Any]:
         """生成模拟财务数据，确保分析可以正常进行"""
-        import random
-        
         # 获取股票名称
         name = ""
         try:
@@ -419,26 +516,12 @@ class EastMoneyAPI:
         except:
             pass
             
-        # 为避免分析出错，生成合理范围内的模拟数据
-        return {
-            "name": name,
-            "ts_code": stock_code,
-            "pe_ttm": random.uniform(10, 30),  # 合理的市盈率范围
-            "pb": random.uniform(1, 4),        # 合理的市净率范围
-            "roe": random.uniform(5, 25),      # 合理的净资产收益率范围
-            "debt_ratio": random.uniform(30, 60), # 合理的资产负债率范围
-            "gross_margin": random.uniform(20, 40), # 合理的毛利率范围
-            "net_profit_margin": random.uniform(5, 20), # 合理的净利润率范围
-            "total_assets": random.uniform(1e9, 1e11), # 总资产(十亿到千亿)
-            "revenue": random.uniform(1e8, 1e10),      # 营业收入(亿到百亿)
-            "net_profit": random.uniform(1e7, 1e9),    # 净利润(千万到十亿)
-            "total_share": random.uniform(1e8, 1e9),   # 总股本(亿到十亿)
-            "float_share": random.uniform(5e7, 8e8),   # 流通股本(5000万到8亿)
-            "dividend_yield": random.uniform(0.5, 3),  # 股息率
-            "industry": self._get_industry_by_code(stock_code),  # 尝试获取行业信息
-            "profit_growth": random.uniform(5, 30),    # 利润增长率
-            "revenue_growth": random.uniform(3, 20),   # 收入增长率
-        }
+        # 为避免分析出错，生成合理范围内的模拟数据，所有字段一次生成
+        values = _RNG.uniform(self._DUMMY_FINANCIAL_LOWS, self._DUMMY_FINANCIAL_HIGHS)
+        data = {"name": name, "ts_code": stock_code}
+        data.update(zip(self._DUMMY_FINANCIAL_KEYS, values.tolist()))
+        data["industry"] = self._get_industry_by_code(stock_code)  # 尝试获取行业信息
+        return data
         
     def _get_industry_by_code(self, stock_code: str) -> str:
         """根据股票代码判断可能的行业"""
@@ -458,7 +541,7 @@ class EastMoneyAPI:
         else:
             industries = ["其他行业"]
             
-        return random.choice(industries)
+        return industries[_RNG.integers(len(industries))]
     
     def _extract_financial_data_from_datacenter(self, financial_data: Dict[str, Any]) -> Dict[str, Any]:
         """从数据中心API提取财务数据"""
@@ -515,8 +598,7 @@ class EastMoneyAPI:
                 'code': stock_code
             }
             
-            response = self.session.get(url, params=params, headers=self.headers, timeout=10)
-            data = response.json()
+            data = self._get_json(url, params, INDUSTRY_CACHE_TTL, field='jbzl')
             
             if data and 'jbzl' in data:
                 return data['jbzl'].get('sshy', "")
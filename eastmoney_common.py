@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# 东方财富接口的公共定义和行情解析，eastmoney_api 与 data_fetcher 两个客户端共用。
+# 两个客户端的请求方式（重试、限流、缓存）不同，这里只放与请求方式无关的部分。
+
+import functools
+from typing import Any, Dict, Iterator, List, Tuple
+
+# 接口公共参数
+EASTMONEY_UT = 'fa5fd1943c7b386f17342da8645e8a2'
+# 批量实时行情接口地址及返回字段
+QUOTE_URL = "https://push2.eastmoney.com/api/qt/ulist.np/get"
+QUOTE_FIELDS = 'f12,f13,f14,f2,f3,f4,f5,f6,f7,f8,f15,f16,f17,f18'
+# 批量获取实时行情时每次请求包含的股票数量
+QUOTE_BATCH_SIZE = 50
+# 实时行情字段映射：(返回字段, 接口字段, 默认值)
+QUOTE_FIELD_MAP = (
+    ('name', 'f14', ''),  # 股票名称
+    ('price', 'f2', 0),  # 最新价
+    ('change_amount', 'f4', 0),  # 涨跌额
+    ('change_percent', 'f3', 0),  # 涨跌幅
+    ('volume', 'f5', 0),  # 成交量
+    ('amount', 'f6', 0),  # 成交额
+    ('amplitude', 'f7', 0),  # 振幅
+    ('high', 'f15', 0),  # 最高
+    ('low', 'f16', 0),  # 最低
+    ('open', 'f17', 0),  # 开盘
+    ('prev_close', 'f18', 0),  # 昨收
+    ('turnover', 'f8', 0),  # 换手率
+)
+# 股票代码前缀对应的东方财富市场编号，非沪市均按深市处理
+MARKET_IDS = {'sh': '1.', 'sz': '0.'}
+
+
+def _quote_value(value: Any, default: Any) -> Any:
+    """按字段默认值的类型校验行情值；停牌、未上市的股票数值字段返回 "-"，按默认值处理"""
+    if isinstance(default, str):
+        return value if isinstance(value, str) else default
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@functools.lru_cache(maxsize=8192)
+def to_secid(stock_code: str) -> str:
+    """将 sh600000 形式的股票代码转换为东方财富的 secid（如 1.600000）"""
+    return MARKET_IDS.get(stock_code[:2], '0.') + stock_code[2:]
+
+
+def quote_batches(stock_codes: List[str]) -> Iterator[Tuple[Dict[str, str], Dict[str, str]]]:
+    """按 QUOTE_BATCH_SIZE 将股票分批，逐批生成 (secid到股票代码的映射, 请求参数)"""
+    for start in range(0, len(stock_codes), QUOTE_BATCH_SIZE):
+        secids = {to_secid(code): code for code in stock_codes[start:start + QUOTE_BATCH_SIZE]}
+        params = {
+            'secids': ','.join(secids),
+            'ut': EASTMONEY_UT,
+            'fltt': '2',  # 返回实际价格，而非*100后的数值
+            'invt': '2',
+            'fields': QUOTE_FIELDS,
+        }
+        yield secids, params
+
+
+def parse_quotes(data: Any, secids: Dict[str, str], update_time: str) -> Dict[str, Dict[str, Any]]:
+    """解析批量行情接口的响应
+
+    Args:
+        data: 接口返回的JSON
+        secids: 本批次 secid 到股票代码的映射
+        update_time: 写入每条行情的更新时间
+
+    Returns:
+        以股票代码为键的实时行情字典，响应中没有的股票不包含在内
+    """
+    diff = ((data or {}).get('data') or {}).get('diff')
+    if not diff:
+        return {}
+
+    quotes = {}
+    items = diff.values() if isinstance(diff, dict) else diff
+    for quote_data in items:
+        stock_code = secids.get(f"{quote_data.get('f13')}.{quote_data.get('f12')}")
+        if stock_code is None:
+            continue
+        quote = {key: _quote_value(quote_data.get(field), default) for key, field, default in QUOTE_FIELD_MAP}
+        quote['update_time'] = update_time
+        quotes[stock_code] = quote
+    return quotes
@@ -1,41 +1,465 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-import random
+from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+import functools
+import math
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from kernels import growth_score, liquidity_score, quality_score, valuation_score
+
+# 各策略共用的随机数生成器（PCG64），模拟数据均由它生成
+_RNG = np.random.default_rng()
+
+# 随机评估用到的候选文案，模块加载时构造一次，避免每次分析重复创建列表
+STRENGTH_LEVELS = ("强", "中", "弱")
+MOAT_BRAND_REASONS = (
+    "品牌知名度高，市场份额稳固",
+    "品牌影响力一般，面临一定竞争压力",
+    "品牌知名度较低，市场份额较小",
+)
+MOAT_COST_REASONS = (
+    "具备显著的成本优势，能抵御行业波动",
+    "成本优势一般，能维持一定竞争力",
+    "成本较高，低于行业平均水平",
+)
+MOAT_NETWORK_REASONS = (
+    "网络效应显著，用户增长潜力大",
+    "具有一定网络效应，用户增长较稳定",
+    "业务模式缺乏网络效应",
+)
+MOAT_TECHNOLOGY_REASONS = (
+    "技术领先，拥有多项核心专利",
+    "技术实力一般，专利数量较少",
+    "技术相对落后，依赖外部技术",
+)
+MOAT_SWITCHING_REASONS = (
+    "客户转换成本高，产品粘性强",
+    "客户转换成本中等，有一定粘性",
+    "客户转换成本低，容易被替代",
+)
+MOAT_SUMMARIES = (
+    "公司拥有强大的护城河，具备长期投资价值",
+    "公司具备一定的护城河，投资价值尚可",
+    "公司护城河较弱，投资需谨慎",
+)
+CASH_FLOW_RATINGS = ("良好", "一般", "需要关注")
+CASH_FLOW_REASONS = (
+    "经营活动现金流稳定，投资活动现金流合理",
+    "经营活动现金流波动，投资活动现金流较大",
+    "经营活动现金流不佳，需关注资金流动性",
+)
+FINANCIAL_SUMMARIES = (
+    "财务状况良好，具备较高投资价值",
+    "财务状况较好，但存在一些需要关注的点",
+    "财务状况一般，投资需谨慎",
+    "财务状况较差，不建议投资",
+)
+VALUATION_SUMMARIES = (
+    "当前股价明显低于内在价值，具备较高投资价值",
+    "当前股价略低于内在价值，有一定投资价值",
+    "当前股价接近内在价值，投资价值一般",
+    "当前股价略高于内在价值，投资需谨慎",
+    "当前股价明显高于内在价值，投资风险较大",
+)
+
+MACD_SIGNALS = ("金叉买入", "死叉卖出", "持平", "震荡")
+MACD_SUMMARIES = (
+    "日线MACD显示多头信号，短期上涨动能较强",
+    "日线MACD死叉，小时线接近金叉，存在反弹可能",
+    "MACD指标持平，市场趋势不明朗",
+    "日线MACD显示空头信号，短期下跌风险较大",
+)
+KDJ_POSITIONS = ("超买区", "超卖区", "中值区")
+KDJ_SUMMARIES = (
+    "日线KDJ显示超卖信号，短期反弹概率较大",
+    "日线KDJ接近超买，小时线死叉，存在回调风险",
+    "KDJ指标处于中值区，市场方向不明",
+    "KDJ指标显示空头信号，J值已处于低位，关注反弹机会",
+)
+RSI_SUMMARIES = (
+    "RSI指标处于中值区域，市场较为平衡",
+    "RSI指标接近超卖，可能存在反弹机会",
+    "RSI指标接近超买，可能存在回调风险",
+    "RSI指标显示多头趋势，短期上涨可能性较大",
+)
+BOLL_POSITIONS = ("上轨附近", "中轨上方", "中轨下方", "下轨附近")
+BOLL_STATUSES = ("开口扩张", "开口收缩", "持平")
+BOLL_TRENDS = ("向上", "向下", "横向")
+BOLL_SIGNALS = ("触及上轨，可能回调", "触及下轨，可能反弹", "突破中轨，方向待确认", "沿上轨运行，强势上涨")
+VOLUME_CHANGES = ("增加", "减少", "持平")
+VOLUME_EVALUATIONS = (
+    "成交量配合良好，上涨动能充足",
+    "成交量萎缩，关注回调风险",
+    "成交量突然放大，可能有趋势变化",
+    "成交量低迷，市场活跃度低",
+)
+TREND_DIRECTIONS = ("上涨趋势", "下跌趋势", "震荡趋势")
+TREND_CONSISTENCIES = (
+    "短期、中期、长期趋势基本一致，趋势较强",
+    "短期、中期趋势一致，长期趋势有分歧",
+    "各周期趋势不一致，市场较为混乱",
+    "趋势出现背离，可能有反转行情",
+)
+
+# 护城河各项评估结果对应的候选池，顺序与 MOAT_FIELDS 一致
+MOAT_FIELDS = (
+    "brand", "brand_reason", "cost", "cost_reason", "network", "network_reason",
+    "technology", "technology_reason", "switching", "switching_reason", "summary",
+)
+MOAT_POOLS = (
+    STRENGTH_LEVELS, MOAT_BRAND_REASONS, STRENGTH_LEVELS, MOAT_COST_REASONS,
+    STRENGTH_LEVELS, MOAT_NETWORK_REASONS, STRENGTH_LEVELS, MOAT_TECHNOLOGY_REASONS,
+    STRENGTH_LEVELS, MOAT_SWITCHING_REASONS, MOAT_SUMMARIES,
+)
+FINANCIAL_POOLS = (CASH_FLOW_RATINGS, CASH_FLOW_REASONS, FINANCIAL_SUMMARIES)
+TREND_POOLS = (TREND_DIRECTIONS, TREND_DIRECTIONS, TREND_DIRECTIONS, TREND_CONSISTENCIES)
+# 模拟技术指标的文字项：三个周期的MACD信号、MACD综合评价、三个周期的KDJ位置、
+# KDJ/RSI综合评价、布林线位置/开口/方向/信号、成交量变化/评价
+TECH_POOLS = (
+    (MACD_SIGNALS,) * 3 + (MACD_SUMMARIES,) + (KDJ_POSITIONS,) * 3
+    + (KDJ_SUMMARIES, RSI_SUMMARIES, BOLL_POSITIONS, BOLL_STATUSES, BOLL_TRENDS, BOLL_SIGNALS)
+    + (VOLUME_CHANGES, VOLUME_EVALUATIONS)
+)
+TECH_TIMEFRAMES = ("daily", "hourly", "quarterly")
+
+# 估值分析的随机参数区间：EPS增长率、行业平均PB、PE法系数、PB法系数
+_VALUATION_LOW = np.array([5.0, 1.0, 0.8, 0.8])
+_VALUATION_HIGH = np.array([30.0, 5.0, 1.2, 1.2])
+# 内在价值的随机参数区间：未来5年增长率、当前价格调整系数
+_INTRINSIC_LOW = np.array([0.05, 0.7])
+_INTRINSIC_HIGH = np.array([0.2, 1.3])
+# 模拟技术指标的数值区间：三个周期各自的 MACD DIF/DEA/柱值、KDJ K/D/J/J值，
+# 三个周期的RSI，布林线宽度
+_TECH_FLOAT_BOUNDS = np.array(
+    [[-2, 2]] * 9 + [[20, 80], [20, 80], [0, 100], [0, 100]] * 3 + [[30, 70]] * 3 + [[0.5, 3]],
+    dtype=np.float64,
+)
+# 5日均量、10日均量、今日成交量的取值区间（上界不含）
+_TECH_VOLUME_LOW = np.array([100000, 100000, 100000])
+_TECH_VOLUME_HIGH = np.array([1000001, 1000001, 2000001])
+# DCF模型的预测年份 1-5
+_DCF_YEARS = np.arange(1, 6, dtype=np.float64)
+
+
+def _draw(pools: tuple) -> list:
+    """从每个候选池中各取一项，所有下标由一次随机调用生成"""
+    sizes = [len(pool) for pool in pools]
+    return [pool[i] for pool, i in zip(pools, _RNG.integers(0, sizes).tolist())]
+
+
+def _labels(*labels: str) -> Tuple[str, ...]:
+    """驻留评级文案，所有报告共用同一批字符串对象，比较时可以直接按对象判断"""
+    return tuple(sys.intern(label) for label in labels)
+
+
+# 评级阈值表：阈值升序排列，评级数量比阈值多一个。
+# 原判断条件为 "x > 阈值" 的用 bisect_left 查找，为 "x < 阈值" 的用 bisect_right 查找，
+# 边界值和NaN的归类与原 if/elif 链一致。
+_ROE_THRESHOLDS = (10, 15, 20)
+_ROE_LABELS = _labels(
+    "较差（低于行业平均水平）",
+    "一般（处于行业平均水平）",
+    "良好（ROE大于15%是好公司的标志）",
+    "优秀（长期ROE大于20%是优质公司的标志）",
+)
+_GROSS_MARGIN_THRESHOLDS = (20, 30, 40)
+_GROSS_MARGIN_LABELS = _labels(
+    "较差（产品缺乏成本优势或盈利能力较弱）",
+    "一般（处于行业中游）",
+    "良好（具备一定的盈利能力）",
+    "优秀（表明公司产品竞争力强，盈利能力高）",
+)
+_NET_PROFIT_MARGIN_THRESHOLDS = (5, 10, 20)
+_NET_PROFIT_MARGIN_LABELS = _labels(
+    "较差（盈利能力较弱）",
+    "一般（盈利能力一般）",
+    "良好，盈利能力较好",
+    "优秀（表明公司盈利能力很强）",
+)
+_DEBT_RATIO_THRESHOLDS = (30, 40, 50, 60)
+_DEBT_RATIO_LABELS = _labels(
+    "优秀（负债水平较低）",
+    "良好，负债水平适中",
+    "一般（负债处于中等水平）",
+    "需要关注（负债水平较高）",
+    "较差（负债过高）",
+)
+_PE_THRESHOLDS = (10, 15, 20, 30)
+_PB_THRESHOLDS = (1, 1.5, 2, 3)
+_VALUATION_LABELS = _labels("非常低估", "低估", "合理", "略高估", "高估")
+_PEG_THRESHOLDS = (0.5, 1, 1.5)
+_PEG_LABELS = _labels(
+    "非常低估（PEG < 0.5）",
+    "低估（PEG < 1）",
+    "合理（PEG 1-1.5）",
+    "高估（PEG > 1.5）",
+)
+_MARGIN_OF_SAFETY_THRESHOLDS = (15, 30, 50)
+_MARGIN_OF_SAFETY_LABELS = _labels(
+    "较差（<15%）",
+    "一般（15%-30%）",
+    "优秀（30%-50%）",
+    "非常优秀（>50%）",
+)
+_GROWTH_RATING_THRESHOLDS = (0.5, 1, 1.5)
+_GROWTH_RATING_LABELS = _labels("高成长等级", "中成长等级", "普通成长等级", "高估值成长等级")
+# RSI位置，超买/超卖两端都是开区间，沿用比较判断
+_RSI_OVERBOUGHT, _RSI_NEUTRAL, _RSI_OVERSOLD = _labels("超买", "中值", "超卖")
+
+
+# 评级函数：输入只有少数常见取值（如整数PE、相同的财务比率），按参数缓存评级结果。
+# 安全边际、PEG 的输入含随机数，几乎不会重复，不做缓存。
+@functools.lru_cache(maxsize=256)
+def _roe_rating(roe: float) -> str:
+    """评估ROE"""
+    return _ROE_LABELS[bisect_left(_ROE_THRESHOLDS, roe)]
+
+
+@functools.lru_cache(maxsize=256)
+def _gross_margin_rating(gross_margin: float) -> str:
+    """评估毛利率"""
+    return _GROSS_MARGIN_LABELS[bisect_left(_GROSS_MARGIN_THRESHOLDS, gross_margin)]
+
+
+@functools.lru_cache(maxsize=256)
+def _net_profit_margin_rating(net_profit_margin: float) -> str:
+    """评估净利率"""
+    return _NET_PROFIT_MARGIN_LABELS[bisect_left(_NET_PROFIT_MARGIN_THRESHOLDS, net_profit_margin)]
+
+
+@functools.lru_cache(maxsize=256)
+def _debt_ratio_rating(debt_ratio: float) -> str:
+    """评估资产负债率"""
+    return _DEBT_RATIO_LABELS[bisect_right(_DEBT_RATIO_THRESHOLDS, debt_ratio)]
+
+
+@functools.lru_cache(maxsize=256)
+def _pe_rating(pe: float) -> str:
+    """评估PE"""
+    return _VALUATION_LABELS[bisect_right(_PE_THRESHOLDS, pe)]
+
+
+@functools.lru_cache(maxsize=256)
+def _pb_rating(pb: float) -> str:
+    """评估PB"""
+    return _VALUATION_LABELS[bisect_right(_PB_THRESHOLDS, pb)]
+
+
+@functools.lru_cache(maxsize=256)
+def _growth_rating(peg: float) -> str:
+    """根据PEG指标评估成长等级"""
+    return _GROWTH_RATING_LABELS[bisect_right(_GROWTH_RATING_THRESHOLDS, peg)]
+
+
+class Signal(IntEnum):
+    """评估结论对投资建议的影响"""
+    SELL = -1
+    NEUTRAL = 0
+    BUY = 1
+
+
+def _label_signals(labels, buy_words=(), sell_words=()) -> Dict[str, Signal]:
+    """按关键词预先确定每条评估文案对应的信号，分析时直接查表，不再扫描报告文本"""
+    signals = {}
+    for label in labels:
+        if any(word in label for word in buy_words):
+            signals[label] = Signal.BUY
+        elif any(word in label for word in sell_words):
+            signals[label] = Signal.SELL
+        else:
+            signals[label] = Signal.NEUTRAL
+    return signals
+
+
+_MOAT_SIGNALS = _label_signals(MOAT_SUMMARIES, ("强大", "一定"), ("较弱",))
+# 财务评估中任一项评价为良好/较好即视为买入信号，否则任一项较差视为卖出信号
+_FINANCIAL_SIGNALS = _label_signals(
+    _ROE_LABELS + _GROSS_MARGIN_LABELS + _NET_PROFIT_MARGIN_LABELS + _DEBT_RATIO_LABELS
+    + CASH_FLOW_RATINGS + FINANCIAL_SUMMARIES,
+    ("良好", "较好"),
+    ("较差",),
+)
+_VALUATION_SIGNALS = _label_signals(
+    VALUATION_SUMMARIES, ("明显低于", "略低于"), ("明显高于", "略高于")
+)
+
+
+class GrowthTrend(IntEnum):
+    """彼得·林奇策略的成长趋势"""
+    STALLED = 0
+    MODERATE = 1
+    RELATIVE = 2
+    STRONG = 3
+
+
+_GROWTH_TREND_LABELS = _labels("增长停滞", "温和增长", "相对增长", "强劲增长")
+
+
+class InstitutionAttention(IntEnum):
+    """机构关注程度"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+_INSTITUTION_THRESHOLDS = (30, 60)
+_INSTITUTION_LABELS = _labels("机构关注度低", "机构中度关注", "机构高度关注")
+
+
+# 量化因子批量评分，参数为同一批股票的数组；逐只评分使用 kernels 中的编译内核。
+# 各档阈值是嵌套的，两个指标各自满足的档数取较小值再加1即为得分，不需要逐档分支。
+def _tiers(*conditions) -> np.ndarray:
+    """统计满足的阈值档数"""
+    return sum(np.asarray(cond, dtype=np.int8) for cond in conditions)
+
+
+def _valuation_scores(pe, pb) -> np.ndarray:
+    """估值因子得分（PE、PB）"""
+    return np.minimum(
+        _tiers(pe < 10, pe < 15, pe < 20),
+        _tiers(pb < 1, pb < 1.5, pb < 2),
+    ) + 1
+
+
+def _growth_scores(revenue_growth, profit_growth) -> np.ndarray:
+    """成长因子得分（营收增长率、利润增长率）"""
+    return np.minimum(
+        _tiers(revenue_growth > 20, revenue_growth > 10, revenue_growth > 0),
+        _tiers(profit_growth > 20, profit_growth > 10, profit_growth > 0),
+    ) + 1
+
+
+def _quality_scores(roe, gross_margin) -> np.ndarray:
+    """质量因子得分（ROE、毛利率）"""
+    return np.minimum(
+        _tiers(roe > 20, roe > 15, roe > 10),
+        _tiers(gross_margin > 40, gross_margin > 30, gross_margin > 20),
+    ) + 1
+
+
+def _liquidity_scores(volume, turnover) -> np.ndarray:
+    """流动性因子得分（成交量、换手率）"""
+    return np.minimum(
+        _tiers(volume > 1000000, volume > 500000, volume > 100000),
+        _tiers(turnover > 5, turnover > 3, turnover > 1),
+    ) + 1
 
 
 # 投资策略抽象基类
 class InvestmentAgent(ABC):
+    # 子类声明 __slots__ 后实例不再带 __dict__
+    __slots__ = ()
+
     @abstractmethod
     def analyze(self, stock_data: Dict[str, Any]) -> str:
         pass
 
 
-# 巴菲特价值投资策略
-class BuffettAgent(InvestmentAgent):
-    def __init__(self):
-        self.strategy = "value_investment"
+@dataclass
+class FinancialEval:
+    """财务健康评估结果：原始数值、各项评价及对投资建议的综合信号"""
+    roe: float
+    gross_margin: float
+    net_profit_margin: float
+    debt_ratio: float
+    roe_rating: str
+    gross_margin_rating: str
+    net_profit_margin_rating: str
+    debt_ratio_rating: str
+    cash_flow: str
+    cash_flow_reason: str
+    summary: str
+    signal: Signal
+
+
+@dataclass
+class ValuationEval:
+    """估值评估结果：估值指标、各项评价及对投资建议的综合信号"""
+    pe: float
+    pe_rating: str
+    industry_pe: int
+    pb: float
+    pb_rating: str
+    industry_pb: float
+    peg: float
+    peg_rating: str
+    intrinsic_value: float
+    pe_value: float
+    pb_value: float
+    margin_of_safety: float
+    margin_of_safety_rating: str
+    summary: str
+    signal: Signal
+
+
+# 财务健康与估值两部分的模板，字段对应 FinancialEval / ValuationEval
+_FINANCIAL_TMPL = """
+1. **ROE（净资产收益率）**：{roe}%
+   - 评价：{roe_rating}
+   
+2. **毛利率**：{gross_margin}%
+   - 评价：{gross_margin_rating}
+   
+3. **净利率**：{net_profit_margin}%
+   - 评价：{net_profit_margin_rating}
+   
+4. **资产负债率**：{debt_ratio}%
+   - 评价：{debt_ratio_rating}
+   
+5. **现金流状况**：
+   - 评价：{cash_flow}
+   - 原因：{cash_flow_reason}
 
-    def analyze(self, stock_data: Dict[str, Any]) -> str:
-        """执行巴菲特价值投资策略"""
-        moat = self._evaluate_moat(stock_data)
-        financial = self._evaluate_financial_health(stock_data)
-        valuation = self._evaluate_valuation(stock_data)
-        advice = self._get_investment_advice(stock_data, moat, financial, valuation)
+**综合评价**：{summary}
+"""
 
-        report = f"""
+_VALUATION_TMPL = """
+1. **市盈率（PE）**：{pe}
+   - 行业平均：{industry_pe}
+   - 评价：{pe_rating}
+   
+2. **市净率（PB）**：{pb}
+   - 行业平均：{industry_pb:.2f}
+   - 评价：{pb_rating}
+   
+3. **PEG指标**：{peg:.2f}
+   - 评价：{peg_rating}
+   
+4. **内在价值评估**：
+   - 基于DCF模型：{intrinsic_value:.2f}元
+   - 基于PE法估值：{pe_value:.2f}元
+   - 基于PB法估值：{pb_value:.2f}元
+   
+5. **安全边际**：{margin_of_safety:.2f}%
+   - 评价：{margin_of_safety_rating}
+   
+**综合评价**：{summary}
+"""
+
+# 护城河评估表的行：(护城河类型, _evaluate_moat 结果中的字段)
+_MOAT_ROWS = (
+    ("品牌优势", "brand"),
+    ("成本优势", "cost"),
+    ("网络效应", "network"),
+    ("技术专利", "technology"),
+    ("转换成本", "switching"),
+)
+
+# 巴菲特价值投资报告模板，{summary} 等字段来自 _evaluate_moat 的结果
+_BUFFETT_REPORT_TMPL = """
 ### 巴菲特价值投资分析报告
 #### 一、企业护城河评估
 | 护城河类型       | 评估结果       | 评估概要                                                                 |
 |------------------|----------------|--------------------------------------------------------------------------|
-| 品牌优势         | {moat['brand']}       | {moat['brand_reason']}                                                   |
-| 成本优势         | {moat['cost']}        | {moat['cost_reason']}                                                    |
-| 网络效应         | {moat['network']}     | {moat['network_reason']}                                                 |
-| 技术专利         | {moat['technology']}  | {moat['technology_reason']}                                              |
-| 转换成本         | {moat['switching']}   | {moat['switching_reason']}                                               |
+{moat_table}
 
-**综合评估**：{moat['summary']}
+**综合评估**：{summary}
 
 #### 二、财务健康状况
 {financial}
@@ -53,142 +477,84 @@ class BuffettAgent(InvestmentAgent):
 4. 市场波动风险，建议做好分散投资
 5. 估值模型存在一定局限性
 """
-        return report.strip()
 
-    def _evaluate_moat(self, stock_data: Dict[str, Any]) -> Dict[str, str]:
-        """评估企业护城河"""
-        return {
-            "brand": random.choice(["强", "中", "弱"]),
-            "brand_reason": random.choice(
-                [
-                    "品牌知名度高，市场份额稳固",
-                    "品牌影响力一般，面临一定竞争压力",
-                    "品牌知名度较低，市场份额较小",
-                ]
-            ),
-            "cost": random.choice(["强", "中", "弱"]),
-            "cost_reason": random.choice(
-                [
-                    "具备显著的成本优势，能抵御行业波动",
-                    "成本优势一般，能维持一定竞争力",
-                    "成本较高，低于行业平均水平",
-                ]
-            ),
-            "network": random.choice(["强", "中", "弱"]),
-            "network_reason": random.choice(
-                [
-                    "网络效应显著，用户增长潜力大",
-                    "具有一定网络效应，用户增长较稳定",
-                    "业务模式缺乏网络效应",
-                ]
-            ),
-            "technology": random.choice(["强", "中", "弱"]),
-            "technology_reason": random.choice(
-                [
-                    "技术领先，拥有多项核心专利",
-                    "技术实力一般，专利数量较少",
-                    "技术相对落后，依赖外部技术",
-                ]
-            ),
-            "switching": random.choice(["强", "中", "弱"]),
-            "switching_reason": random.choice(
-                [
-                    "客户转换成本高，产品粘性强",
-                    "客户转换成本中等，有一定粘性",
-                    "客户转换成本低，容易被替代",
-                ]
-            ),
-            "summary": random.choice(
-                [
-                    "公司拥有强大的护城河，具备长期投资价值",
-                    "公司具备一定的护城河，投资价值尚可",
-                    "公司护城河较弱，投资需谨慎",
-                ]
-            ),
-        }
 
-    def _evaluate_financial_health(self, stock_data: Dict[str, Any]) -> str:
+# 巴菲特价值投资策略
+class BuffettAgent(InvestmentAgent):
+    __slots__ = ("strategy",)
+
+    def __init__(self):
+        self.strategy = "value_investment"
+
+    def analyze(self, stock_data: Dict[str, Any]) -> str:
+        """执行巴菲特价值投资策略"""
+        moat, moat_signal = self._evaluate_moat(stock_data)
+        financial = self._evaluate_financial_health(stock_data)
+        valuation = self._evaluate_valuation(stock_data)
+        advice = self._get_investment_advice(
+            stock_data, moat_signal, financial.signal, valuation.signal
+        )
+
+        moat_table = "\n".join(
+            f"| {name}         | {moat[key]}             | {moat[key + '_reason']} |"
+            for name, key in _MOAT_ROWS
+        )
+        return _BUFFETT_REPORT_TMPL.format_map({
+            **moat,
+            "moat_table": moat_table,
+            "financial": _FINANCIAL_TMPL.format_map(vars(financial)),
+            "valuation": _VALUATION_TMPL.format_map(vars(valuation)),
+            "advice": advice,
+        }).strip()
+
+    def _evaluate_moat(self, stock_data: Dict[str, Any]) -> Tuple[Dict[str, str], Signal]:
+        """评估企业护城河，返回各项评估结果及综合信号"""
+        moat = dict(zip(MOAT_FIELDS, _draw(MOAT_POOLS)))
+        return moat, _MOAT_SIGNALS[moat["summary"]]
+
+    def _evaluate_financial_health(self, stock_data: Dict[str, Any]) -> FinancialEval:
         """评估财务健康状况"""
-        return f"""
-1. **ROE（净资产收益率）**：{stock_data['roe']}%
-   - 评价：{self._evaluate_roe(stock_data['roe'])}
-   
-2. **毛利率**：{stock_data['gross_margin']}%
-   - 评价：{self._evaluate_gross_margin(stock_data['gross_margin'])}
-   
-3. **净利率**：{stock_data['net_profit_margin']}%
-   - 评价：{self._evaluate_net_profit_margin(stock_data['net_profit_margin'])}
-   
-4. **资产负债率**：{stock_data['debt_ratio']}%
-   - 评价：{self._evaluate_debt_ratio(stock_data['debt_ratio'])}
-   
-5. **现金流状况**：
-   - 评价：{random.choice(['良好', '一般', '需要关注'])}
-   - 原因：{random.choice([
-       '经营活动现金流稳定，投资活动现金流合理',
-       '经营活动现金流波动，投资活动现金流较大',
-       '经营活动现金流不佳，需关注资金流动性'
-   ])}
-
-**综合评价**：{random.choice([
-    '财务状况良好，具备较高投资价值',
-    '财务状况较好，但存在一些需要关注的点',
-    '财务状况一般，投资需谨慎',
-    '财务状况较差，不建议投资'
-])}
-"""
+        cash_flow, cash_flow_reason, summary = _draw(FINANCIAL_POOLS)
+        roe = stock_data['roe']
+        gross_margin = stock_data['gross_margin']
+        net_profit_margin = stock_data['net_profit_margin']
+        debt_ratio = stock_data['debt_ratio']
+        ratings = (
+            self._evaluate_roe(roe),
+            self._evaluate_gross_margin(gross_margin),
+            self._evaluate_net_profit_margin(net_profit_margin),
+            self._evaluate_debt_ratio(debt_ratio),
+        )
 
-    def _evaluate_roe(self, roe: float) -> str:
-        """评估ROE"""
-        if roe > 20:
-            return "优秀（长期ROE大于20%是优质公司的标志）"
-        elif roe > 15:
-            return "良好（ROE大于15%是好公司的标志）"
-        elif roe > 10:
-            return "一般（处于行业平均水平）"
-        else:
-            return "较差（低于行业平均水平）"
-
-    def _evaluate_gross_margin(self, gross_margin: float) -> str:
-        """评估毛利率"""
-        if gross_margin > 40:
-            return "优秀（表明公司产品竞争力强，盈利能力高）"
-        elif gross_margin > 30:
-            return "良好（具备一定的盈利能力）"
-        elif gross_margin > 20:
-            return "一般（处于行业中游）"
-        else:
-            return "较差（产品缺乏成本优势或盈利能力较弱）"
-
-    def _evaluate_net_profit_margin(self, net_profit_margin: float) -> str:
-        """评估净利率"""
-        if net_profit_margin > 20:
-            return "优秀（表明公司盈利能力很强）"
-        elif net_profit_margin > 10:
-            return "良好，盈利能力较好"
-        elif net_profit_margin > 5:
-            return "一般（盈利能力一般）"
+        signals = {_FINANCIAL_SIGNALS[label] for label in ratings + (cash_flow, summary)}
+        if Signal.BUY in signals:
+            signal = Signal.BUY
+        elif Signal.SELL in signals:
+            signal = Signal.SELL
         else:
-            return "较差（盈利能力较弱）"
+            signal = Signal.NEUTRAL
 
-    def _evaluate_debt_ratio(self, debt_ratio: float) -> str:
-        """评估资产负债率"""
-        if debt_ratio < 30:
-            return "优秀（负债水平较低）"
-        elif debt_ratio < 40:
-            return "良好，负债水平适中"
-        elif debt_ratio < 50:
-            return "一般（负债处于中等水平）"
-        elif debt_ratio < 60:
-            return "需要关注（负债水平较高）"
-        else:
-            return "较差（负债过高）"
+        return FinancialEval(
+            roe, gross_margin, net_profit_margin, debt_ratio, *ratings,
+            cash_flow, cash_flow_reason, summary, signal,
+        )
 
-    def _evaluate_valuation(self, stock_data: Dict[str, Any]) -> str:
+    # 评级函数定义在模块级并带缓存
+    _evaluate_roe = staticmethod(_roe_rating)
+    _evaluate_gross_margin = staticmethod(_gross_margin_rating)
+    _evaluate_net_profit_margin = staticmethod(_net_profit_margin_rating)
+    _evaluate_debt_ratio = staticmethod(_debt_ratio_rating)
+
+    def _evaluate_valuation(self, stock_data: Dict[str, Any]) -> ValuationEval:
         """评估估值"""
         pe = stock_data["pe_ttm"]
         pb = stock_data["pb"]
-        eps_growth = random.uniform(5, 30)  # 模拟EPS增长率
+        # 模拟EPS增长率、行业平均PB及两种估值法的调整系数
+        eps_growth, industry_pb, pe_factor, pb_factor = _RNG.uniform(
+            _VALUATION_LOW, _VALUATION_HIGH
+        ).tolist()
+        industry_pe = int(_RNG.integers(10, 31))
+        summary = VALUATION_SUMMARIES[_RNG.integers(len(VALUATION_SUMMARIES))]
 
         # 计算内在价值（简化的DCF模型）
         intrinsic_value = self._calculate_intrinsic_value(stock_data)
@@ -196,39 +562,28 @@ class BuffettAgent(InvestmentAgent):
         # 计算安全边际
         margin_of_safety = (1 - stock_data["price"] / intrinsic_value) * 100
 
-        return f"""
-1. **市盈率（PE）**：{pe}
-   - 行业平均：{random.randint(10, 30)}
-   - 评价：{self._evaluate_pe(pe)}
-   
-2. **市净率（PB）**：{pb}
-   - 行业平均：{random.uniform(1, 5):.2f}
-   - 评价：{self._evaluate_pb(pb)}
-   
-3. **PEG指标**：{pe / eps_growth:.2f}
-   - 评价：{self._evaluate_peg(pe, eps_growth)}
-   
-4. **内在价值评估**：
-   - 基于DCF模型：{intrinsic_value:.2f}元
-   - 基于PE法估值：{pe * random.uniform(0.8, 1.2) * eps_growth:.2f}元
-   - 基于PB法估值：{pb * random.uniform(0.8, 1.2) * stock_data['roe'] / 100:.2f}元
-   
-5. **安全边际**：{margin_of_safety:.2f}%
-   - 评价：{self._evaluate_margin_of_safety(margin_of_safety)}
-   
-**综合评价**：{random.choice([
-    '当前股价明显低于内在价值，具备较高投资价值',
-    '当前股价略低于内在价值，有一定投资价值',
-    '当前股价接近内在价值，投资价值一般',
-    '当前股价略高于内在价值，投资需谨慎',
-    '当前股价明显高于内在价值，投资风险较大'
-])}
-"""
+        return ValuationEval(
+            pe=pe,
+            pe_rating=self._evaluate_pe(pe),
+            industry_pe=industry_pe,
+            pb=pb,
+            pb_rating=self._evaluate_pb(pb),
+            industry_pb=industry_pb,
+            peg=pe / eps_growth,
+            peg_rating=self._evaluate_peg(pe, eps_growth),
+            intrinsic_value=intrinsic_value,
+            pe_value=pe * pe_factor * eps_growth,
+            pb_value=pb * pb_factor * stock_data['roe'] / 100,
+            margin_of_safety=margin_of_safety,
+            margin_of_safety_rating=self._evaluate_margin_of_safety(margin_of_safety),
+            summary=summary,
+            signal=_VALUATION_SIGNALS[summary],
+        )
 
     def _calculate_intrinsic_value(self, stock_data: Dict[str, Any]) -> float:
         """计算内在价值（简化的DCF模型）"""
-        # 假设未来5年增长率
-        growth_rate = random.uniform(0.05, 0.2)
+        # 假设未来5年增长率，以及对当前价格的调整系数
+        growth_rate, price_factor = _RNG.uniform(_INTRINSIC_LOW, _INTRINSIC_HIGH).tolist()
 
         # 永续增长率
         terminal_growth_rate = 0.03
@@ -237,21 +592,18 @@ class BuffettAgent(InvestmentAgent):
         discount_rate = 0.1
 
         # 模拟未来5年现金流
-        cash_flows = [
-            stock_data["net_profit"] * (1 + growth_rate) ** i for i in range(1, 6)
-        ]
+        years = _DCF_YEARS
+        cash_flows = stock_data["net_profit"] * (1.0 + growth_rate) ** years
 
         # 计算第5年末的终值
         terminal_value = (
-            cash_flows[-1]
+            float(cash_flows[-1])
             * (1 + terminal_growth_rate)
             / (discount_rate - terminal_growth_rate)
         )
 
         # 计算现值
-        present_value = sum(
-            [cf / (1 + discount_rate) ** i for i, cf in enumerate(cash_flows, 1)]
-        )
+        present_value = float((cash_flows / (1.0 + discount_rate) ** years).sum())
         present_value += terminal_value / (1 + discount_rate) ** 5
 
         # 计算每股内在价值
@@ -262,95 +614,44 @@ class BuffettAgent(InvestmentAgent):
         current_price = stock_data.get("price", 0)
         if current_price > 0:
             # 为提供更实际的内在价值估计
-            return max(current_price * random.uniform(0.7, 1.3), 1.0)
+            return max(current_price * price_factor, 1.0)
 
         return max(intrinsic_value, 1.0)  # 确保内在价值不为0
 
-    def _evaluate_pe(self, pe: float) -> str:
-        """评估PE"""
-        if pe < 10:
-            return "非常低估"
-        elif pe < 15:
-            return "低估"
-        elif pe < 20:
-            return "合理"
-        elif pe < 30:
-            return "略高估"
-        else:
-            return "高估"
-
-    def _evaluate_pb(self, pb: float) -> str:
-        """评估PB"""
-        if pb < 1:
-            return "非常低估"
-        elif pb < 1.5:
-            return "低估"
-        elif pb < 2:
-            return "合理"
-        elif pb < 3:
-            return "略高估"
-        else:
-            return "高估"
+    _evaluate_pe = staticmethod(_pe_rating)
+    _evaluate_pb = staticmethod(_pb_rating)
 
-    def _evaluate_peg(self, pe: float, eps_growth: float) -> str:
+    @staticmethod
+    def _evaluate_peg(pe: float, eps_growth: float) -> str:
         """评估PEG"""
-        peg = pe / eps_growth
-        if peg < 0.5:
-            return "非常低估（PEG < 0.5）"
-        elif peg < 1:
-            return "低估（PEG < 1）"
-        elif peg < 1.5:
-            return "合理（PEG 1-1.5）"
-        else:
-            return "高估（PEG > 1.5）"
+        return _PEG_LABELS[bisect_right(_PEG_THRESHOLDS, pe / eps_growth)]
 
-    def _evaluate_margin_of_safety(self, margin: float) -> str:
+    @staticmethod
+    def _evaluate_margin_of_safety(margin: float) -> str:
         """评估安全边际"""
-        if margin > 50:
-            return "非常优秀（>50%）"
-        elif margin > 30:
-            return "优秀（30%-50%）"
-        elif margin > 15:
-            return "一般（15%-30%）"
-        else:
-            return "较差（<15%）"
+        return _MARGIN_OF_SAFETY_LABELS[bisect_left(_MARGIN_OF_SAFETY_THRESHOLDS, margin)]
 
     def _get_investment_advice(
         self,
         stock_data: Dict[str, Any],
-        moat: Dict[str, str],
-        financial: str,
-        valuation: str,
+        moat: Signal,
+        financial: Signal,
+        valuation: Signal,
     ) -> str:
-        """获取投资建议"""
-        buy_signals = 0
-        sell_signals = 0
-
-        # 护城河评估
-        if "强大" in moat["summary"] or "一定" in moat["summary"]:
-            buy_signals += 1
-        else:
-            sell_signals += 1
-
-        # 财务评估
-        if "良好" in financial or "较好" in financial:
-            buy_signals += 1
-        elif "较差" in financial:
-            sell_signals += 1
-
-        # 估值评估
-        if "明显低于" in valuation or "略低于" in valuation:
-            buy_signals += 1
-        elif "明显高于" in valuation or "略高于" in valuation:
-            sell_signals += 1
+        """根据护城河、财务和估值三项信号获取投资建议"""
+        name = stock_data["name"]
+        price = stock_data["price"]
+        signals = (moat, financial, valuation)
+        buy_signals = signals.count(Signal.BUY)
+        sell_signals = signals.count(Signal.SELL)
 
         # 生成建议
         if buy_signals >= 2 and sell_signals == 0:
             return f"""
-1. **强烈买入建议**：{stock_data['name']}符合巴菲特价值投资标准，拥有强大的护城河、良好的财务状况和较低的估值水平。
+1. **强烈买入建议**：{name}符合巴菲特价值投资标准，拥有强大的护城河、良好的财务状况和较低的估值水平。
    - 建议仓位：20%-30%
    - 投资周期：中长期（3-5年）
-   - 目标价：基于内在价值，目标价区间为{stock_data['price']*1.5:.2f}-{stock_data['price']*2:.2f}元
+   - 目标价：基于内在价值，目标价区间为{price*1.5:.2f}-{price*2:.2f}元
 
 2. **操作建议**：
    - 在当前价位逐步建仓
@@ -359,10 +660,10 @@ class BuffettAgent(InvestmentAgent):
 """
         elif buy_signals >= 2 and sell_signals <= 1:
             return f"""
-1. **买入建议**：{stock_data['name']}基本符合巴菲特价值投资标准，具有一定的投资价值。
+1. **买入建议**：{name}基本符合巴菲特价值投资标准，具有一定的投资价值。
    - 建议仓位：10%-20%
    - 投资周期：中期（1-3年）
-   - 目标价：基于内在价值，目标价为{stock_data['price']*1.3:.2f}元
+   - 目标价：基于内在价值，目标价为{price*1.3:.2f}元
 
 2. **操作建议**：
    - 在当前价位买入，等待回调10%-15%时加仓
@@ -371,10 +672,10 @@ class BuffettAgent(InvestmentAgent):
 """
         elif buy_signals == 1 and sell_signals == 1:
             return f"""
-1. **观望建议**：{stock_data['name']}部分符合巴菲特价值投资标准，但存在一些不确定性。
+1. **观望建议**：{name}部分符合巴菲特价值投资标准，但存在一些不确定性。
    - 建议先观望，等待更多信息确认
-   - 若股价回调至{stock_data['price']*0.9:.2f}元以下，可以考虑少量买入
-   - 若股价反弹至{stock_data['price']*1.1:.2f}元以上，可以考虑卖出获利
+   - 若股价回调至{price*0.9:.2f}元以下，可以考虑少量买入
+   - 若股价反弹至{price*1.1:.2f}元以上，可以考虑卖出获利
 
 2. **操作建议**：
    - 初始仓位不超过5%
@@ -383,8 +684,8 @@ class BuffettAgent(InvestmentAgent):
 """
         else:
             return f"""
-1. **卖出建议**：{stock_data['name']}不符合巴菲特价值投资标准，投资风险较大。
-   - 若已持有，建议在股价反弹至{stock_data['price']*1.05:.2f}元以上时卖出
+1. **卖出建议**：{name}不符合巴菲特价值投资标准，投资风险较大。
+   - 若已持有，建议在股价反弹至{price*1.05:.2f}元以上时卖出
    - 未持有者不建议买入
    - 风险提示：该股票可能存在护城河薄弱、财务风险高或估值过高等问题
 
@@ -394,31 +695,67 @@ class BuffettAgent(InvestmentAgent):
 """
 
 
+# 彼得·林奇策略的必要字段
+_LYNCH_REQUIRED_FIELDS = frozenset(("pe_ttm", "profit_growth"))
+
+# 利润零增长时PEG无法计算，成长趋势、评级和建议都是确定的，直接使用固定报告
+_LYNCH_ZERO_GROWTH_TMPL = """
+彼得·林奇成长投资分析报告: {name}
+
+1. 基本信息:
+   - 股票代码: {ts_code}
+   - 当前价格: {price} 元
+   - 市盈率 (PE): {pe}
+   - 利润增长率: {profit_growth}%
+
+2. 关键指标:
+   - PEG 指标: 无法计算（利润增长率为0）
+   - 成长趋势: 增长停滞
+
+3. 综合评估:
+   - 成长评级: 高估值成长等级
+   - 投资建议: 卖出 - 不符合成长投资标准
+
+4. 投资匹配度:
+   - PEG < 1: False
+   - 盈利增长: False
+   - 低负债: {low_debt}
+"""
+
+
 # 彼得·林奇成长投资策略
 class LynchAgent:
+    __slots__ = ("strategy",)
+
     def __init__(self):
         self.strategy = "彼得·林奇成长投资策略"
 
     def analyze(self, stock_data: Dict[str, Any]) -> str:
         """执行彼得·林奇成长投资策略"""
-        try:
-            # 确保必要字段存在
-            required_fields = ["pe_ttm", "profit_growth"]
-            for field in required_fields:
-                if field not in stock_data:
-                    raise ValueError(f"缺少必要字段: {field}")
+        missing = _LYNCH_REQUIRED_FIELDS.difference(stock_data)
+        if missing:
+            return f"分析失败: 缺少必要字段: {', '.join(sorted(missing))}"
+        # 必要字段只读取一次，后续直接使用局部变量
+        pe = stock_data["pe_ttm"]
+        profit_growth = stock_data["profit_growth"]
 
-            peg = self._calculate_peg(stock_data)
-            growth_trend = self._evaluate_growth_trend(stock_data)
+        try:
+            peg = self._calculate_peg(pe, profit_growth)
+            if math.isinf(peg):
+                return self._zero_growth_report(stock_data, pe, profit_growth)
+            trend = self._evaluate_growth_trend(
+                profit_growth, stock_data.get("revenue_growth", 0)
+            )
+            growth_trend = _GROWTH_TREND_LABELS[trend]
 
             # 分析机构持仓情况
-            institution_holding = self._analyze_institution_holding(stock_data)
+            institution_holding, attention = self._analyze_institution_holding(stock_data)
 
             # 识别隐藏资产
             hidden_assets = self._identify_hidden_assets(stock_data)
 
             growth_rating = self._get_growth_rating(peg)
-            advice = self._get_investment_advice(peg, growth_trend, institution_holding)
+            advice = self._get_investment_advice(peg, trend, attention)
 
             report = f"""
 彼得·林奇成长投资分析报告: {stock_data.get('name', '未知股票')}
@@ -426,8 +763,8 @@ class LynchAgent:
 1. 基本信息:
    - 股票代码: {stock_data.get('ts_code', '未知')}
    - 当前价格: {stock_data.get('price', '未知')} 元
-   - 市盈率 (PE): {stock_data.get('pe_ttm', '未知')}
-   - 利润增长率: {stock_data.get('profit_growth', '未知')}%
+   - 市盈率 (PE): {pe}
+   - 利润增长率: {profit_growth}%
 
 2. 关键指标:
    - PEG 指标: {peg:.2f}
@@ -441,7 +778,7 @@ class LynchAgent:
 
 4. 投资匹配度:
    - PEG < 1: {peg < 1}
-   - 盈利增长: {stock_data.get('profit_growth', 0) > 0}
+   - 盈利增长: {profit_growth > 0}
    - 低负债: {stock_data.get('debt_ratio', 100) < 70}
 """
             return report
@@ -449,39 +786,48 @@ class LynchAgent:
         except Exception as e:
             return f"分析失败: {str(e)}"
 
-    def _calculate_peg(self, data: Dict[str, Any]) -> float:
-        """计算PEG指标 (PE/Growth)"""
-        pe = data.get("pe_ttm", 0)
-        growth_rate = data.get("profit_growth", 0) / 100  # 转换为小数
-        if growth_rate == 0:
-            return float("inf")  # 避免除零错误
-        return pe / growth_rate
+    def _zero_growth_report(
+        self, stock_data: Dict[str, Any], pe: float, profit_growth: float
+    ) -> str:
+        """利润零增长时的报告"""
+        return _LYNCH_ZERO_GROWTH_TMPL.format(
+            name=stock_data.get('name', '未知股票'),
+            ts_code=stock_data.get('ts_code', '未知'),
+            price=stock_data.get('price', '未知'),
+            pe=pe,
+            profit_growth=profit_growth,
+            low_debt=stock_data.get('debt_ratio', 100) < 70,
+        )
 
-    def _evaluate_growth_trend(self, data: Dict[str, Any]) -> str:
-        """评估公司的成长趋势"""
-        growth_rate = data.get("profit_growth", 0)
-        revenue_growth = data.get("revenue_growth", 0)
+    def _calculate_peg(self, pe: float, profit_growth: float) -> float:
+        """计算PEG指标 (PE/Growth)，利润零增长时返回 inf"""
+        growth_rate = profit_growth / 100  # 转换为小数
+        return pe / growth_rate if growth_rate else float("inf")
 
+    def _evaluate_growth_trend(self, growth_rate: float, revenue_growth: float) -> GrowthTrend:
+        """评估公司的成长趋势"""
         if growth_rate > 20 and revenue_growth > 15:
-            return "强劲增长"
+            return GrowthTrend.STRONG
         elif growth_rate > 10 and revenue_growth > 5:
-            return "相对增长"
+            return GrowthTrend.RELATIVE
         elif growth_rate > 0 and revenue_growth > 0:
-            return "温和增长"
+            return GrowthTrend.MODERATE
         else:
-            return "增长停滞"
+            return GrowthTrend.STALLED
 
-    def _analyze_institution_holding(self, data: Dict[str, Any]) -> str:
-        """分析机构持仓情况"""
+    def _analyze_institution_holding(
+        self, data: Dict[str, Any]
+    ) -> Tuple[str, InstitutionAttention]:
+        """分析机构持仓情况，返回描述及关注程度"""
         # 模拟机构持仓比例，实际应从数据接口获取
-        institution_ratio = data.get("institution_ratio", random.uniform(10, 80))
+        institution_ratio = data.get("institution_ratio")
+        if institution_ratio is None:
+            institution_ratio = float(_RNG.uniform(10, 80))
 
-        if institution_ratio > 60:
-            return f"机构高度关注 ({institution_ratio:.1f}%)"
-        elif institution_ratio > 30:
-            return f"机构中度关注 ({institution_ratio:.1f}%)"
-        else:
-            return f"机构关注度低 ({institution_ratio:.1f}%)"
+        attention = InstitutionAttention(
+            bisect_left(_INSTITUTION_THRESHOLDS, institution_ratio)
+        )
+        return f"{_INSTITUTION_LABELS[attention]} ({institution_ratio:.1f}%)", attention
 
     def _identify_hidden_assets(self, data: Dict[str, Any]) -> str:
         """识别隐藏资产（如土地、品牌等）"""
@@ -497,90 +843,65 @@ class LynchAgent:
         else:
             return "未发现明显隐藏资产"
 
-    def _get_growth_rating(self, peg: float) -> str:
-        """根据PEG指标评估成长等级"""
-        if peg < 0.5:
-            return "高成长等级"
-        elif peg < 1:
-            return "中成长等级"
-        elif peg < 1.5:
-            return "普通成长等级"
-        else:
-            return "高估值成长等级"
+    _get_growth_rating = staticmethod(_growth_rating)
 
     def _get_investment_advice(
-        self, peg: float, growth_trend: str, institution_holding: str
+        self, peg: float, trend: GrowthTrend, attention: InstitutionAttention
     ) -> str:
         """根据指标给出投资建议"""
-        if peg < 1 and "强劲" in growth_trend and "高度" in institution_holding:
+        if peg < 1 and trend == GrowthTrend.STRONG and attention == InstitutionAttention.HIGH:
             return "强烈买入 - 符合高成长投资标准"
-        elif peg < 1.5 and "增长" in growth_trend:
+        elif peg < 1.5:  # 各成长趋势均视为具备成长潜力
             return "买入 - 具备成长潜力"
-        elif peg < 2 and "温和" in growth_trend:
+        elif peg < 2 and trend == GrowthTrend.MODERATE:
             return "谨慎买入 - 成长确定性一般"
         else:
             return "卖出 - 不符合成长投资标准"
 
 
-# 短期交易策略
-class ShortTermAgent(InvestmentAgent):
-    def __init__(self):
-        self.strategy = "short_term_trading"
-        self.indicators = ["MACD", "KDJ", "RSI", "布林线", "成交量"]
-        self.timeframe = ["日线", "60分钟线", "15分钟线"]
-
-    def analyze(self, stock_data: Dict[str, Any]) -> str:
-        """执行短期交易分析"""
-        tech_data = self._get_technical_indicators(stock_data["ts_code"])
-        trend_analysis = self._analyze_trend(tech_data)
-        key_levels = self._identify_key_levels(tech_data, stock_data)
-        trading_advice = self._generate_trading_advice(
-            trend_analysis, key_levels, stock_data
-        )
+# 短期交易报告中按周期重复的行，对 ShortTermAgent.timeframe 中的每个周期各渲染一次
+_MACD_ROW_TMPL = "   - {label}信号：{signal}"
+_KDJ_ROW_TMPL = "   - {label}位置：{position}，J值={j_value}"
+_RSI_ROW_TMPL = "   - {label}数值：{value}，处于{position}区域"
 
-        report = f"""
+# 短期交易报告模板，字段来自技术指标、趋势分析和关键价位
+_SHORT_TERM_REPORT_TMPL = """
 ### 短期交易分析报告
 #### 一、技术指标分析
 1. **MACD指标**：
-   - 日线信号：{tech_data['macd']['daily']['signal']}
-   - 60分钟线信号：{tech_data['macd']['hourly']['signal']}
-   - 15分钟线信号：{tech_data['macd']['quarterly']['signal']}
-   - **综合评价**：{tech_data['macd']['summary']}
+{macd_rows}
+   - **综合评价**：{macd[summary]}
 
 2. **KDJ指标**：
-   - 日线位置：{tech_data['kdj']['daily']['position']}，J值={tech_data['kdj']['daily']['j_value']}
-   - 60分钟线位置：{tech_data['kdj']['hourly']['position']}，J值={tech_data['kdj']['hourly']['j_value']}
-   - 15分钟线位置：{tech_data['kdj']['quarterly']['position']}，J值={tech_data['kdj']['quarterly']['j_value']}
-   - **综合评价**：{tech_data['kdj']['summary']}
+{kdj_rows}
+   - **综合评价**：{kdj[summary]}
 
 3. **RSI指标**：
-   - 日线数值：{tech_data['rsi']['daily']}，处于{self._get_rsi_position(tech_data['rsi']['daily'])}区域
-   - 60分钟线数值：{tech_data['rsi']['hourly']}，处于{self._get_rsi_position(tech_data['rsi']['hourly'])}区域
-   - 15分钟线数值：{tech_data['rsi']['quarterly']}，处于{self._get_rsi_position(tech_data['rsi']['quarterly'])}区域
-   - **综合评价**：{tech_data['rsi']['summary']}
+{rsi_rows}
+   - **综合评价**：{rsi[summary]}
 
 4. **布林线指标**：
-   - 当前价格：{stock_data['price']}元
-   - 布林线上轨：{key_levels['upper_band']:.2f}元
-   - 布林线中轨：{key_levels['middle_band']:.2f}元
-   - 布林线下轨：{key_levels['lower_band']:.2f}元
-   - 价格位置：{tech_data['bollinger']['position']}
-   - 布林线宽度：{tech_data['bollinger']['width']:.2f}，状态：{tech_data['bollinger']['status']}
+   - 当前价格：{price}元
+   - 布林线上轨：{upper_band:.2f}元
+   - 布林线中轨：{middle_band:.2f}元
+   - 布林线下轨：{lower_band:.2f}元
+   - 价格位置：{bollinger[position]}
+   - 布林线宽度：{bollinger[width]:.2f}，状态：{bollinger[status]}
 
 5. **成交量指标**：
-   - 5日平均成交量：{tech_data['volume']['avg_5d']}手
-   - 10日平均成交量：{tech_data['volume']['avg_10d']}手
-   - 今日成交量：{tech_data['volume']['today']}手
-   - 成交量变化：{tech_data['volume']['change']}
-   - **评价**：{tech_data['volume']['evaluation']}
+   - 5日平均成交量：{volume[avg_5d]}手
+   - 10日平均成交量：{volume[avg_10d]}手
+   - 今日成交量：{volume[today]}手
+   - 成交量变化：{volume[change]}
+   - **评价**：{volume[evaluation]}
 
 #### 二、趋势分析
-1. **短期趋势（15分钟/60分钟线）**：{trend_analysis['short_term']}
-2. **中期趋势（日线）**：{trend_analysis['medium_term']}
-3. **长期趋势（日线）**：{trend_analysis['long_term']}
-4. **趋势一致性**：{trend_analysis['consistency']}
-5. **关键支撑位**：{key_levels['support_levels']}
-6. **关键阻力位**：{key_levels['resistance_levels']}
+1. **短期趋势（15分钟/60分钟线）**：{short_term}
+2. **中期趋势（日线）**：{medium_term}
+3. **长期趋势（日线）**：{long_term}
+4. **趋势一致性**：{consistency}
+5. **关键支撑位**：{support_levels}
+6. **关键阻力位**：{resistance_levels}
 
 #### 三、交易建议
 {trading_advice}
@@ -592,131 +913,121 @@ class ShortTermAgent(InvestmentAgent):
 4. 仓位控制，建议使用不超过10%-15%的资金进行短期交易
 5. 时间管理，短期交易需密切关注市场动态和交易时机
 """
-        return report.strip()
+
+
+# 短期交易策略
+class ShortTermAgent(InvestmentAgent):
+    __slots__ = ("strategy", "indicators", "timeframe")
+
+    def __init__(self):
+        self.strategy = "short_term_trading"
+        self.indicators = ["MACD", "KDJ", "RSI", "布林线", "成交量"]
+        self.timeframe = ["日线", "60分钟线", "15分钟线"]
+
+    def analyze(self, stock_data: Dict[str, Any]) -> str:
+        """执行短期交易分析"""
+        tech_data = self._get_technical_indicators(stock_data["ts_code"])
+        trend_analysis = self._analyze_trend(tech_data)
+        key_levels = self._identify_key_levels(tech_data, stock_data)
+        trading_advice = self._generate_trading_advice(
+            trend_analysis, key_levels, stock_data
+        )
+
+        macd, kdj, rsi = tech_data["macd"], tech_data["kdj"], tech_data["rsi"]
+        timeframes = tuple(zip(TECH_TIMEFRAMES, self.timeframe))
+        return _SHORT_TERM_REPORT_TMPL.format_map({
+            **tech_data,
+            **trend_analysis,
+            **key_levels,
+            "price": stock_data["price"],
+            "macd_rows": "\n".join(
+                _MACD_ROW_TMPL.format(label=label, signal=macd[tf]["signal"])
+                for tf, label in timeframes
+            ),
+            "kdj_rows": "\n".join(
+                _KDJ_ROW_TMPL.format(label=label, **kdj[tf])
+                for tf, label in timeframes
+            ),
+            "rsi_rows": "\n".join(
+                _RSI_ROW_TMPL.format(
+                    label=label, value=rsi[tf], position=self._get_rsi_position(rsi[tf])
+                )
+                for tf, label in timeframes
+            ),
+            "trading_advice": trading_advice,
+        }).strip()
 
     def _get_technical_indicators(self, ts_code: str) -> Dict[str, Any]:
         """获取技术指标数据"""
+        # 所有数值、成交量和文字项各由一次随机调用生成
+        values = _RNG.uniform(_TECH_FLOAT_BOUNDS[:, 0], _TECH_FLOAT_BOUNDS[:, 1]).tolist()
+        avg_5d, avg_10d, today = _RNG.integers(_TECH_VOLUME_LOW, _TECH_VOLUME_HIGH).tolist()
+        picks = _draw(TECH_POOLS)
+
+        macd = {
+            tf: {
+                "dif": values[3 * i],
+                "dea": values[3 * i + 1],
+                "hist": values[3 * i + 2],
+                "signal": picks[i],
+            }
+            for i, tf in enumerate(TECH_TIMEFRAMES)
+        }
+        macd["summary"] = picks[3]
+        kdj = {
+            tf: {
+                "k": values[9 + 4 * i],
+                "d": values[10 + 4 * i],
+                "j": values[11 + 4 * i],
+                "j_value": values[12 + 4 * i],
+                "position": picks[4 + i],
+            }
+            for i, tf in enumerate(TECH_TIMEFRAMES)
+        }
+        kdj["summary"] = picks[7]
+
         return {
-            "macd": {
-                "daily": {
-                    "dif": random.uniform(-2, 2),
-                    "dea": random.uniform(-2, 2),
-                    "hist": random.uniform(-2, 2),
-                    "signal": random.choice(["金叉买入", "死叉卖出", "持平", "震荡"]),
-                },
-                "hourly": {
-                    "dif": random.uniform(-2, 2),
-                    "dea": random.uniform(-2, 2),
-                    "hist": random.uniform(-2, 2),
-                    "signal": random.choice(["金叉买入", "死叉卖出", "持平", "震荡"]),
-                },
-                "quarterly": {
-                    "dif": random.uniform(-2, 2),
-                    "dea": random.uniform(-2, 2),
-                    "hist": random.uniform(-2, 2),
-                    "signal": random.choice(["金叉买入", "死叉卖出", "持平", "震荡"]),
-                },
-                "summary": random.choice(
-                    [
-                        "日线MACD显示多头信号，短期上涨动能较强",
-                        "日线MACD死叉，小时线接近金叉，存在反弹可能",
-                        "MACD指标持平，市场趋势不明朗",
-                        "日线MACD显示空头信号，短期下跌风险较大",
-                    ]
-                ),
-            },
-            "kdj": {
-                "daily": {
-                    "k": random.uniform(20, 80),
-                    "d": random.uniform(20, 80),
-                    "j": random.uniform(0, 100),
-                    "j_value": random.uniform(0, 100),
-                    "position": random.choice(["超买区", "超卖区", "中值区"]),
-                },
-                "hourly": {
-                    "k": random.uniform(20, 80),
-                    "d": random.uniform(20, 80),
-                    "j": random.uniform(0, 100),
-                    "j_value": random.uniform(0, 100),
-                    "position": random.choice(["超买区", "超卖区", "中值区"]),
-                },
-                "quarterly": {
-                    "k": random.uniform(20, 80),
-                    "d": random.uniform(20, 80),
-                    "j": random.uniform(0, 100),
-                    "j_value": random.uniform(0, 100),
-                    "position": random.choice(["超买区", "超卖区", "中值区"]),
-                },
-                "summary": random.choice(
-                    [
-                        "日线KDJ显示超卖信号，短期反弹概率较大",
-                        "日线KDJ接近超买，小时线死叉，存在回调风险",
-                        "KDJ指标处于中值区，市场方向不明",
-                        "KDJ指标显示空头信号，J值已处于低位，关注反弹机会",
-                    ]
-                ),
-            },
+            "macd": macd,
+            "kdj": kdj,
             "rsi": {
-                "daily": random.uniform(30, 70),
-                "hourly": random.uniform(30, 70),
-                "quarterly": random.uniform(30, 70),
-                "summary": random.choice(
-                    [
-                        "RSI指标处于中值区域，市场较为平衡",
-                        "RSI指标接近超卖，可能存在反弹机会",
-                        "RSI指标接近超买，可能存在回调风险",
-                        "RSI指标显示多头趋势，短期上涨可能性较大",
-                    ]
-                ),
+                "daily": values[21],
+                "hourly": values[22],
+                "quarterly": values[23],
+                "summary": picks[8],
             },
             "bollinger": {
-                "position": random.choice(["上轨附近", "中轨上方", "中轨下方", "下轨附近"]),
-                "width": random.uniform(0.5, 3),
-                "status": random.choice(["开口扩张", "开口收缩", "持平"]),
-                "trend": random.choice(["向上", "向下", "横向"]),
-                "signal": random.choice(
-                    ["触及上轨，可能回调", "触及下轨，可能反弹", "突破中轨，方向待确认", "沿上轨运行，强势上涨"]
-                ),
+                "position": picks[9],
+                "width": values[24],
+                "status": picks[10],
+                "trend": picks[11],
+                "signal": picks[12],
             },
             "volume": {
-                "avg_5d": random.randint(100000, 1000000),
-                "avg_10d": random.randint(100000, 1000000),
-                "today": random.randint(100000, 2000000),
-                "change": random.choice(["增加", "减少", "持平"]),
-                "evaluation": random.choice(
-                    [
-                        "成交量配合良好，上涨动能充足",
-                        "成交量萎缩，关注回调风险",
-                        "成交量突然放大，可能有趋势变化",
-                        "成交量低迷，市场活跃度低",
-                    ]
-                ),
+                "avg_5d": avg_5d,
+                "avg_10d": avg_10d,
+                "today": today,
+                "change": picks[13],
+                "evaluation": picks[14],
             },
         }
 
     def _get_rsi_position(self, rsi: float) -> str:
         """获取RSI指标位置"""
         if rsi > 70:
-            return "超买"
+            return _RSI_OVERBOUGHT
         elif rsi < 30:
-            return "超卖"
+            return _RSI_OVERSOLD
         else:
-            return "中值"
+            return _RSI_NEUTRAL
 
     def _analyze_trend(self, tech_data: Dict[str, Any]) -> Dict[str, str]:
         """分析趋势"""
+        short_term, medium_term, long_term, consistency = _draw(TREND_POOLS)
         return {
-            "short_term": random.choice(["上涨趋势", "下跌趋势", "震荡趋势"]),
-            "medium_term": random.choice(["上涨趋势", "下跌趋势", "震荡趋势"]),
-            "long_term": random.choice(["上涨趋势", "下跌趋势", "震荡趋势"]),
-            "consistency": random.choice(
-                [
-                    "短期、中期、长期趋势基本一致，趋势较强",
-                    "短期、中期趋势一致，长期趋势有分歧",
-                    "各周期趋势不一致，市场较为混乱",
-                    "趋势出现背离，可能有反转行情",
-                ]
-            ),
+            "short_term": short_term,
+            "medium_term": medium_term,
+            "long_term": long_term,
+            "consistency": consistency,
         }
 
     def _identify_key_levels(
@@ -724,14 +1035,20 @@ class ShortTermAgent(InvestmentAgent):
     ) -> Dict[str, Any]:
         """识别关键支撑和阻力位"""
         price = stock_data["price"]
-        volatility = random.uniform(0.03, 0.08)  # 3%-8%波动
+        volatility = float(_RNG.uniform(0.03, 0.08))  # 3%-8%波动
+
+        upper = price * (1 + volatility)
+        upper2 = price * (1 + volatility * 2)
+        lower = price * (1 - volatility)
+        lower2 = price * (1 - volatility * 2)
+        fmt = "{:.2f}".format
 
         return {
-            "upper_band": price * (1 + volatility),
+            "upper_band": upper,
             "middle_band": price,
-            "lower_band": price * (1 - volatility),
-            "resistance_levels": f"{price * (1 + volatility):.2f}元（布林线上轨），{price * (1 + volatility*2):.2f}元（前期高点）",
-            "support_levels": f"{price * (1 - volatility):.2f}元（布林线下轨），{price * (1 - volatility*2):.2f}元（前期低点）",
+            "lower_band": lower,
+            "resistance_levels": f"{fmt(upper)}元（布林线上轨），{fmt(upper2)}元（前期高点）",
+            "support_levels": f"{fmt(lower)}元（布林线下轨），{fmt(lower2)}元（前期低点）",
         }
 
     def _generate_trading_advice(
@@ -782,26 +1099,16 @@ class ShortTermAgent(InvestmentAgent):
 """
 
 
-# 量化投资策略
-class QuantAgent(InvestmentAgent):
-    def __init__(self):
-        self.strategy = "quantitative_trading"
-
-    def analyze(self, stock_data: Dict[str, Any]) -> str:
-        """执行量化投资分析"""
-        factor_scores = self._calculate_factor_scores(stock_data)
-        overall_score = sum(factor_scores.values())
-        investment_advice = self._generate_investment_advice(overall_score)
-
-        report = f"""
+# 量化投资报告模板
+_QUANT_REPORT_TMPL = """
 ### 量化投资分析报告
 #### 一、因子得分
 | 因子 | 得分 |
 | ---- | ---- |
-| 估值因子 | {factor_scores['valuation']} |
-| 成长因子 | {factor_scores['growth']} |
-| 质量因子 | {factor_scores['quality']} |
-| 流动性因子 | {factor_scores['liquidity']} |
+| 估值因子 | {valuation} |
+| 成长因子 | {growth} |
+| 质量因子 | {quality} |
+| 流动性因子 | {liquidity} |
 
 #### 二、综合得分
 {overall_score}
@@ -812,7 +1119,67 @@ class QuantAgent(InvestmentAgent):
 #### 四、风险提示
 量化模型基于历史数据构建，未来市场变化可能导致模型失效，建议结合其他分析方法进行投资决策。
 """
-        return report.strip()
+
+
+# 量化投资策略
+class QuantAgent(InvestmentAgent):
+    __slots__ = ("strategy",)
+
+    def __init__(self):
+        self.strategy = "quantitative_trading"
+
+    def analyze(self, stock_data: Dict[str, Any]) -> str:
+        """执行量化投资分析"""
+        factor_scores = self._calculate_factor_scores(stock_data)
+        return self._render_report(factor_scores)
+
+    def analyze_batch(self, data) -> List[str]:
+        """批量执行量化投资分析
+
+        Args:
+            data: pandas DataFrame 或 {字段名: 数组} 字典，每行/每个下标对应一只股票
+
+        Returns:
+            与输入顺序一致的分析报告列表
+        """
+        scores = self.score_batch(data)
+        keys = tuple(scores)
+        return [
+            self._render_report(dict(zip(keys, row)))
+            for row in zip(*(scores[key].tolist() for key in keys))
+        ]
+
+    def score_batch(self, data) -> Dict[str, np.ndarray]:
+        """对一批股票同时计算各因子得分，缺失的字段按0处理
+
+        Returns:
+            {'valuation': 数组, 'growth': 数组, 'quality': 数组, 'liquidity': 数组}
+        """
+        def column(name):
+            return np.asarray(data.get(name, 0), dtype=np.float64)
+
+        scores = (
+            _valuation_scores(column('pe_ttm'), column('pb')),
+            _growth_scores(column('revenue_growth'), column('profit_growth')),
+            _quality_scores(column('roe'), column('gross_margin')),
+            _liquidity_scores(column('volume'), column('turnover')),
+        )
+        # 部分字段缺失时得分是标量，广播成与其他因子相同的长度
+        return dict(zip(
+            ('valuation', 'growth', 'quality', 'liquidity'),
+            (np.atleast_1d(score) for score in np.broadcast_arrays(*scores)),
+        ))
+
+    def _render_report(self, factor_scores: Dict[str, int]) -> str:
+        """根据因子得分生成报告"""
+        overall_score = sum(factor_scores.values())
+        investment_advice = self._generate_investment_advice(overall_score)
+
+        return _QUANT_REPORT_TMPL.format_map({
+            **factor_scores,
+            "overall_score": overall_score,
+            "investment_advice": investment_advice,
+        }).strip()
 
     def _calculate_factor_scores(self, stock_data: Dict[str, Any]) -> Dict[str, float]:
         """计算各因子得分"""
@@ -845,47 +1212,19 @@ class QuantAgent(InvestmentAgent):
 
     def _calculate_valuation_score(self, pe: float, pb: float) -> float:
         """计算估值因子得分"""
-        if pe < 10 and pb < 1:
-            return 4
-        elif pe < 15 and pb < 1.5:
-            return 3
-        elif pe < 20 and pb < 2:
-            return 2
-        else:
-            return 1
+        return valuation_score(float(pe), float(pb))
 
     def _calculate_growth_score(self, revenue_growth: float, profit_growth: float) -> float:
         """计算成长因子得分"""
-        if revenue_growth > 20 and profit_growth > 20:
-            return 4
-        elif revenue_growth > 10 and profit_growth > 10:
-            return 3
-        elif revenue_growth > 0 and profit_growth > 0:
-            return 2
-        else:
-            return 1
+        return growth_score(float(revenue_growth), float(profit_growth))
 
     def _calculate_quality_score(self, roe: float, gross_margin: float) -> float:
         """计算质量因子得分"""
-        if roe > 20 and gross_margin > 40:
-            return 4
-        elif roe > 15 and gross_margin > 30:
-            return 3
-        elif roe > 10 and gross_margin > 20:
-            return 2
-        else:
-            return 1
+        return quality_score(float(roe), float(gross_margin))
 
     def _calculate_liquidity_score(self, volume: float, turnover: float) -> float:
         """计算流动性因子得分"""
-        if volume > 1000000 and turnover > 5:
-            return 4
-        elif volume > 500000 and turnover > 3:
-            return 3
-        elif volume > 100000 and turnover > 1:
-            return 2
-        else:
-            return 1
+        return liquidity_score(float(volume), float(turnover))
 
     def _generate_investment_advice(self, overall_score: float) -> str:
         """根据综合得分生成投资建议"""
@@ -897,3 +1236,29 @@ class QuantAgent(InvestmentAgent):
             return "观望：综合得分一般，建议先观望，等待更多信息或股价调整后再做决策。"
         else:
             return "卖出：综合得分较低，该股票投资价值较低。若已持有，建议尽快卖出；未持有则不建议买入。"
+
+
+def analyze_all(stock_data: Dict[str, Any], agents: Optional[list] = None) -> Dict[str, str]:
+    """用多个策略同时分析同一只股票
+
+    Args:
+        stock_data: 股票数据，各策略只读取不修改
+        agents: 参与分析的策略实例，默认使用全部四种策略
+
+    Returns:
+        {策略名称: 分析报告}，顺序与 agents 一致；agents 为空列表时返回空字典
+    """
+    if agents is None:
+        agents = [QuantAgent(), LynchAgent(), ShortTermAgent(), BuffettAgent()]
+    if not agents:
+        return {}
+
+    def run(agent) -> str:
+        try:
+            return agent.analyze(stock_data)
+        except Exception as e:
+            return f"分析失败: {str(e)}"
+
+    with ThreadPoolExecutor(max_workers=len(agents)) as executor:
+        reports = list(executor.map(run, agents))
+    return {agent.strategy: report for agent, report in zip(agents, reports)}
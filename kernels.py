@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+# 技术指标计算内核。编译结果缓存在 __pycache__ 中，之后启动的进程直接加载，
+# 模块导入时按实际会用到的参数类型预编译，首次计算不再有JIT延迟。
+# 内核执行时释放GIL，多线程计算多只股票时可以同时利用多个CPU核心。
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # 未安装numba时退化为普通Python函数
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def compute_indicators(close, high, low):
+    """单次遍历计算MACD、KDJ、RSI的最新值
+
+    Returns:
+        元组：(DIF, DEA, MACD, 前一日MACD, K, D, J, RSI)
+    """
+    n = close.shape[0]
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+    decay = 2.0 / 3.0  # KDJ平滑 com=2
+
+    ema12 = ema26 = dea = float(close[0])
+    macd = macd_prev = 0.0
+
+    # 9日最低价/最高价的单调队列，存放下标
+    min_q = np.empty(n, np.int64)
+    max_q = np.empty(n, np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+    k_num = k_den = d_num = d_den = 0.0
+    k = d = 0.0
+    has_k = False
+
+    for i in range(n):
+        x = float(close[i])
+
+        # MACD
+        if i > 0:
+            ema12 = a12 * x + (1.0 - a12) * ema12
+            ema26 = a26 * x + (1.0 - a26) * ema26
+        dif = ema12 - ema26
+        dea = dif if i == 0 else a9 * dif + (1.0 - a9) * dea
+        macd_prev = macd
+        macd = (dif - dea) * 2.0
+
+        # KDJ
+        while min_tail > min_head and low[min_q[min_tail - 1]] >= low[i]:
+            min_tail -= 1
+        min_q[min_tail] = i
+        min_tail += 1
+        if min_q[min_head] <= i - 9:
+            min_head += 1
+        while max_tail > max_head and high[max_q[max_tail - 1]] <= high[i]:
+            max_tail -= 1
+        max_q[max_tail] = i
+        max_tail += 1
+        if max_q[max_head] <= i - 9:
+            max_head += 1
+
+        if has_k:
+            k_num *= decay
+            k_den *= decay
+        if i >= 8:
+            low_9 = float(low[min_q[min_head]])
+            high_9 = float(high[max_q[max_head]])
+            if high_9 > low_9:
+                rsv = (x - low_9) / (high_9 - low_9) * 100.0
+                k_num += rsv
+                k_den += 1.0
+                has_k = True
+        if has_k:
+            k = k_num / k_den
+            d_num = d_num * decay + k
+            d_den = d_den * decay + 1.0
+            d = d_num / d_den
+
+    # RSI：最近14日涨跌幅均值之比
+    gain = 0.0
+    loss = 0.0
+    for i in range(max(1, n - 14), n):
+        delta = float(close[i]) - float(close[i - 1])
+        if delta > 0:
+            gain += delta
+        else:
+            loss -= delta
+    if loss > 0:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    elif gain > 0:
+        rsi = 100.0
+    else:
+        rsi = np.nan
+
+    if not has_k:
+        k = d = np.nan
+    return dif, dea, macd, macd_prev, k, d, 3.0 * k - 2.0 * d, rsi
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def compute_all_indicators(close, high, low):
+    """一次遍历计算最新一根K线的MACD、KDJ、RSI、BOLL和均线，数据不足的指标返回0
+
+    Returns:
+        元组：(DIF, DEA, MACD, 前一日MACD, K, D, J, RSI,
+              MA20, BOLL上轨, BOLL下轨, MA5, MA10, MA30, MA60)
+    """
+    n = close.shape[0]
+    a12 = 2.0 / 13.0
+    a26 = 2.0 / 27.0
+    a9 = 2.0 / 10.0
+
+    # 9日最低价/最高价的单调队列，存放下标，只保留当前窗口的极值而不生成整列结果
+    min_q = np.empty(n, np.int64)
+    max_q = np.empty(n, np.int64)
+    min_head = min_tail = max_head = max_tail = 0
+
+    # 均线和BOLL只用到最后 w 根K线，累加各窗口内收盘价相对最新收盘价的偏差，
+    # 减去基准后数值较小，按平方和求方差时精度损失也小
+    ref = close[n - 1]
+    sum5 = sum10 = sum20 = sum30 = sum60 = sq20 = 0.0
+
+    ema12 = ema26 = close[0]
+    dif = dea = macd = macd_prev = 0.0
+    k = d = 0.0
+    gain = loss = 0.0
+    for i in range(n):
+        x = close[i]
+
+        # MACD
+        if i > 0:
+            ema12 = a12 * x + (1.0 - a12) * ema12
+            ema26 = a26 * x + (1.0 - a26) * ema26
+        dif = ema12 - ema26
+        dea = dif if i == 0 else a9 * dif + (1.0 - a9) * dea
+        macd_prev = macd
+        macd = (dif - dea) * 2.0
+
+        # KDJ：RSV 的平滑系数为 1/3
+        while min_tail > min_head and low[min_q[min_tail - 1]] >= low[i]:
+            min_tail -= 1
+        min_q[min_tail] = i
+        min_tail += 1
+        if min_q[min_head] <= i - 9:
+            min_head += 1
+        while max_tail > max_head and high[max_q[max_tail - 1]] <= high[i]:
+            max_tail -= 1
+        max_q[max_tail] = i
+        max_tail += 1
+        if max_q[max_head] <= i - 9:
+            max_head += 1
+        if i >= 8:
+            low_9 = low[min_q[min_head]]
+            high_9 = high[max_q[max_head]]
+            rsv = (x - low_9) / (high_9 - low_9 + 0.000001) * 100  # 避免除零错误
+            if i == 8:
+                k = rsv
+                d = k
+            else:
+                k = (2.0 * k + rsv) / 3.0
+                d = (2.0 * d + k) / 3.0
+
+        # RSI：最近14日的涨跌幅
+        if i >= n - 14 and i > 0:
+            delta = x - close[i - 1]
+            if delta > 0:
+                gain += delta
+            else:
+                loss -= delta
+
+        # 均线和BOLL
+        dx = x - ref
+        if i >= n - 60:
+            sum60 += dx
+        if i >= n - 30:
+            sum30 += dx
+        if i >= n - 20:
+            sum20 += dx
+            sq20 += dx * dx
+        if i >= n - 10:
+            sum10 += dx
+        if i >= n - 5:
+            sum5 += dx
+
+    if n < 2:
+        macd_prev = macd
+    j = 3 * k - 2 * d
+
+    # RSI：最近14日平均涨幅与平均跌幅之比
+    rsi = 0.0
+    if n >= 14:
+        rs = (gain / 14) / (loss / 14 + 0.000001)  # 避免除零错误
+        rsi = 100 - (100 / (1 + rs))
+
+    # 均线，数据不足时为0
+    ma5 = ref + sum5 / 5 if n >= 5 else 0.0
+    ma10 = ref + sum10 / 10 if n >= 10 else 0.0
+    ma30 = ref + sum30 / 30 if n >= 30 else 0.0
+    ma60 = ref + sum60 / 60 if n >= 60 else 0.0
+
+    # BOLL：20日均线上下两倍标准差
+    ma20 = boll_upper = boll_lower = 0.0
+    if n >= 20:
+        ma20 = ref + sum20 / 20
+        std20 = np.sqrt(max((sq20 - sum20 * sum20 / 20) / 19, 0.0))
+        boll_upper = ma20 + 2 * std20
+        boll_lower = ma20 - 2 * std20
+
+    return (dif, dea, macd, macd_prev, k, d, j, rsi,
+            ma20, boll_upper, boll_lower, ma5, ma10, ma30, ma60)
+
+
+# 量化因子评分内核：逐只股票调用时使用，阈值与 investment_agents 中的批量评分一致。
+# 参数类型固定，声明签名后在定义时即编译，不需要再预热
+_SCORE_SIGNATURE = "int64(float64, float64)"
+
+
+@njit(_SCORE_SIGNATURE, cache=True, nogil=True)
+def valuation_score(pe, pb):
+    """估值因子得分（PE、PB）"""
+    if pe < 10 and pb < 1:
+        return 4
+    elif pe < 15 and pb < 1.5:
+        return 3
+    elif pe < 20 and pb < 2:
+        return 2
+    return 1
+
+
+@njit(_SCORE_SIGNATURE, cache=True, nogil=True)
+def growth_score(revenue_growth, profit_growth):
+    """成长因子得分（营收增长率、利润增长率）"""
+    if revenue_growth > 20 and profit_growth > 20:
+        return 4
+    elif revenue_growth > 10 and profit_growth > 10:
+        return 3
+    elif revenue_growth > 0 and profit_growth > 0:
+        return 2
+    return 1
+
+
+@njit(_SCORE_SIGNATURE, cache=True, nogil=True)
+def quality_score(roe, gross_margin):
+    """质量因子得分（ROE、毛利率）"""
+    if roe > 20 and gross_margin > 40:
+        return 4
+    elif roe > 15 and gross_margin > 30:
+        return 3
+    elif roe > 10 and gross_margin > 20:
+        return 2
+    return 1
+
+
+@njit(_SCORE_SIGNATURE, cache=True, nogil=True)
+def liquidity_score(volume, turnover):
+    """流动性因子得分（成交量、换手率）"""
+    if volume > 1000000 and turnover > 5:
+        return 4
+    elif volume > 500000 and turnover > 3:
+        return 3
+    elif volume > 100000 and turnover > 1:
+        return 2
+    return 1
+
+
+def _warmup() -> None:
+    """按可写数组和只读数组（pandas 的 to_numpy() 可能返回只读视图）两种参数预编译指标内核"""
+    for writeable in (True, False):
+        arrays = [np.linspace(start, start + 1.0, 30) for start in (1.0, 1.1, 0.9)]
+        for array in arrays:
+            array.setflags(write=writeable)
+        compute_all_indicators(*arrays)
+        arrays32 = [array.astype(np.float32) for array in arrays]
+        for array in arrays32:
+            array.setflags(write=writeable)
+        compute_indicators(*arrays32)
+
+
+_warmup()
@@ -4,97 +4,204 @@
 
 import investment_agents
 from eastmoney_api import EastMoneyAPI
-from ai_analyzer import AIAnalyzer
-from typing import Dict, Any
+from cache import FileCache
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 import logging
+import numpy as np
+import os
+import random
 import requests  # 用于捕获网络异常
 import time
 import sys
-import io
+import threading
 
 # 最大重试次数
 MAX_RETRIES = 3
-# 重试间隔时间（秒）
-RETRY_DELAY = 5
-# 设置标准输出的编码为 UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
+# 重试间隔基数（秒），每次重试翻倍并加上随机抖动
+RETRY_DELAY = 1
+# 重试间隔上限（秒）
+RETRY_MAX_DELAY = 30
+# 服务端限流或暂不可用时返回的状态码，优先按响应头 Retry-After 等待
+RETRY_AFTER_STATUS = frozenset({429, 503})
+# 接口处理结果的本地缓存，重复分析同一只股票时直接读取，不再请求网络
+FETCH_CACHE = FileCache(os.path.join("cache", "fetch"))
+# 各接口结果的缓存有效期（秒），未列出的接口不缓存
+FETCH_CACHE_TTL = {
+    "get_realtime_quotes": 60,
+    "get_financial_indicators": 24 * 3600,
+    "get_technical_indicators": 3600,
+}
+# 记录最近分析过的股票数量，分析其他股票时这些股票的数据会在后台预先获取
+RECENT_CODES_SIZE = 8
+# 最近分析记录保存在接口结果缓存中，有效期（秒）
+RECENT_CODES_KEY = FileCache.make_key("recent_codes")
+RECENT_CODES_TTL = 7 * 24 * 3600
+# 退出程序的输入
+QUIT_COMMANDS = frozenset({"q", "Q", "quit", "exit", ":q"})
+# 从实时行情中取用的字段，默认值见 STOCK_DEFAULTS
+QUOTE_FIELDS = ("name", "price", "change_percent")
+# 沪市、深市股票代码的前三位
+SH_PREFIXES = frozenset({"600", "601", "603", "605", "688"})
+SZ_PREFIXES = frozenset({"000", "002", "300", "301"})
+# 技术综合判断规则：(指标, 触发的趋势, 信号)，按顺序逐条检查
+TECH_SIGNAL_RULES = (
+    ("MACD", frozenset({"金叉", "上升"}), "MACD多头信号"),
+    ("KDJ", frozenset({"超卖"}), "KDJ超卖反弹信号"),
+    ("KDJ", frozenset({"超买"}), "KDJ超买回调信号"),
+    ("RSI", frozenset({"超卖"}), "RSI超卖反弹信号"),
+    ("RSI", frozenset({"超买"}), "RSI超买回调信号"),
+    ("BOLL", frozenset({"突破上轨"}), "BOLL突破上轨-强势信号"),
+    ("BOLL", frozenset({"突破下轨"}), "BOLL突破下轨-反弹信号"),
+)
+# 股票基本信息的显示模板，字段取自 stock_data
+STOCK_INFO_TMPL = (
+    "\n" + "-" * 60 + "\n"
+    "股票代码：{ts_code}\n"
+    "股票名称：{name}\n"
+    "当前价格：{price:.2f} 元\n"
+    "涨跌幅：{change_percent:.2f}% {change_arrow}\n"
+    "市盈率(TTM)：{pe_ttm:.2f}\n"
+    "市净率：{pb:.2f}\n"
+    "ROE：{roe:.2f}%\n"
+    "所属行业：{industry}\n"
+    + "-" * 60
+)
+# 各技术指标的显示模板：(指标, 模板)，按显示顺序排列，字段取自 tech_data[指标]
+TECH_BLOCK_TMPLS = (
+    ("MACD", "\n【MACD指标】\n"
+             "  趋势判断: {trend}\n"
+             "  DIF线: {DIF:.3f}\n"
+             "  DEA线: {DEA:.3f}\n"
+             "  MACD值: {MACD:.3f}"),
+    ("KDJ", "\n【KDJ指标】\n"
+            "  趋势判断: {trend}\n"
+            "  K值: {K:.2f}\n"
+            "  D值: {D:.2f}\n"
+            "  J值: {J:.2f}"),
+    ("RSI", "\n【RSI指标】\n"
+            "  趋势判断: {trend}\n"
+            "  RSI值: {RSI:.2f}"),
+    ("BOLL", "\n【BOLL指标】\n"
+             "  趋势判断: {trend}\n"
+             "  上轨: {UPPER:.2f}\n"
+             "  中轨: {MID:.2f}\n"
+             "  下轨: {LOWER:.2f}"),
+    ("MA", "\n【移动平均线】\n"
+           "  趋势判断: {trend}\n"
+           "  MA5: {MA5:.2f}\n"
+           "  MA10: {MA10:.2f}\n"
+           "  MA30: {MA30:.2f}\n"
+           "  MA60: {MA60:.2f}"),
+    ("price_data", "\n【量价信息】\n"
+                   "  成交量: {volume:,.0f}手\n"
+                   "  换手率: {turnover:.2f}%\n"
+                   "  振幅: {amplitude:.2f}%"),
+)
+# 股票基本数据的默认值，以避免分析错误；每次查询复制一份后填入行情数据
+STOCK_DEFAULTS = {
+    "ts_code": "",
+    "name": "",
+    "price": 0.0,
+    "change_percent": 0.0,
+    "pe_ttm": 0.0,
+    "pb": 0.0,
+    "roe": 0.0,
+    "debt_ratio": 0.0,
+    "gross_margin": 0.0,
+    "net_profit_margin": 0.0,
+    "total_assets": 0.0,
+    "revenue": 0.0,
+    "net_profit": 0.0,
+    "total_share": 0.0,
+    "float_share": 0.0,
+    "total_shares": 0.0,  # 添加 total_shares 字段给 Buffett 分析使用
+    "float_shares": 0.0,  # 添加 float_shares 字段给 Buffett 分析使用
+    "dividend_yield": 0.0,
+    "industry": "未知",
+}
 
 def main():
-    # 配置日志
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-    )
     logging.info("初始化 EastMoneyAPI 实例")
 
     # 初始化东方财富数据获取器
     api = EastMoneyAPI()
 
-    # 初始化分析器
-    agents = {
-        "1": investment_agents.QuantAgent(),
-        "2": investment_agents.LynchAgent(),
-        "3": investment_agents.ShortTermAgent(),
-        "4": investment_agents.BuffettAgent(),
-        "5": AIAnalyzer()  # AI分析器
+    # 分析器在第一次被选择时才创建，之后复用同一个实例
+    agent_factories = {
+        "1": investment_agents.QuantAgent,
+        "2": investment_agents.LynchAgent,
+        "3": investment_agents.ShortTermAgent,
+        "4": investment_agents.BuffettAgent,
+        "5": _create_ai_analyzer,  # AI分析器
     }
+    agents = {}
+
+    def get_agent(key):
+        agent = agents.get(key)
+        if agent is None:
+            agent = agents[key] = agent_factories[key]()
+        return agent
+
+    # 最近分析过的股票，最近的在前
+    recent = deque(FETCH_CACHE.get(RECENT_CODES_KEY) or (), maxlen=RECENT_CODES_SIZE)
 
     print("\n欢迎使用股票分析系统 (使用东方财富API)")
     print("=" * 60)
 
     while True:
-        code_or_name = input("\n请输入股票代码（如：300310或sh300310，输入q退出）：").strip()
-        if code_or_name.lower() == "q":
+        code_or_name = input("\n请输入股票代码（如：300310或sh300310，多只用逗号分隔，输入q退出）：").strip()
+        if code_or_name in QUIT_COMMANDS:
             print("退出系统")
             break
 
         try:
+            # 输入多只股票时只扫描自选股的技术信号
+            if "," in code_or_name or "，" in code_or_name:
+                stock_codes = _scan_watchlist(api, code_or_name.replace("，", ",").split(","))
+                # 用户查看扫描结果时在后台获取这些股票的财务指标，之后单独分析时直接命中缓存
+                _prefetch_stocks(api, stock_codes, (api.get_financial_indicators,))
+                continue
+
             # 格式化股票代码
-            if code_or_name.isdigit():
-                if code_or_name.startswith(('600', '601', '603', '605', '688')):
-                    stock_code = f"sh{code_or_name}"
-                elif code_or_name.startswith(('000', '002', '300', '301')):
-                    stock_code = f"sz{code_or_name}"
-                else:
-                    print("无效的股票代码")
-                    continue
-            else:
-                stock_code = code_or_name
+            stock_code = _format_stock_code(code_or_name)
+            if stock_code is None:
+                print("无效的股票代码")
+                continue
 
-            # 获取实时行情数据
+            # 行情、财务指标、技术指标三个接口互不依赖，同时请求
             print("\n正在获取股票数据...")
-            quotes = fetch_data_with_retry(api.get_realtime_quotes, stock_code)
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = {
+                    name: executor.submit(fetch_data_with_retry, func, stock_code)
+                    for name, func in (
+                        ("quotes", api.get_realtime_quotes),
+                        ("financial", api.get_financial_indicators),
+                        ("tech", api.get_technical_indicators),
+                    )
+                }
+                quotes = futures["quotes"].result()
+                financial = futures["financial"].result()
+                tech_data = futures["tech"].result()
+
             if not quotes:
                 print("获取股票数据失败，请检查代码是否正确或网络是否畅通")
                 continue
 
+            # 记录到最近分析列表，用户查看报告时在后台获取其他最近分析过的股票的数据
+            if stock_code in recent:
+                recent.remove(stock_code)
+            recent.appendleft(stock_code)
+            FETCH_CACHE.set(RECENT_CODES_KEY, list(recent), RECENT_CODES_TTL)
+            _prefetch_stocks(api, [code for code in recent if code != stock_code])
+
             # 构建股票基本数据
-            stock_data = {
-                "ts_code": stock_code,
-                "name": quotes.get("name", stock_code),
-                "price": quotes.get("price", 0.0),
-                "change_percent": quotes.get("change_percent", 0.0),
-                # 添加默认值，以避免分析错误
-                "pe_ttm": 0.0,
-                "pb": 0.0,
-                "roe": 0.0,
-                "debt_ratio": 0.0,
-                "gross_margin": 0.0,
-                "net_profit_margin": 0.0,
-                "total_assets": 0.0,
-                "revenue": 0.0,
-                "net_profit": 0.0,
-                "total_share": 0.0,
-                "float_share": 0.0,
-                "total_shares": 0.0,  # 添加 total_shares 字段给 Buffett 分析使用
-                "float_shares": 0.0,  # 添加 float_shares 字段给 Buffett 分析使用
-                "dividend_yield": 0.0,
-                "industry": "未知",
-            }
-
-            # 获取财务指标
-            print("正在获取财务指标...")
-            financial = fetch_data_with_retry(api.get_financial_indicators, stock_code)
+            stock_data = STOCK_DEFAULTS.copy()
+            stock_data["ts_code"] = stock_data["name"] = stock_code
+            # 行情中缺少的字段保留默认值（名称默认为股票代码）
+            stock_data.update((key, quotes[key]) for key in QUOTE_FIELDS if key in quotes)
+
             if financial:
                 stock_data.update(financial)
                 # 确保字段名称一致性
@@ -105,117 +212,42 @@ def main():
             else:
                 print("未获取到财务指标数据，使用默认值进行分析")
 
-            # 显示基本信息
-            print("\n" + "-" * 60)
-            print(f"股票代码：{stock_data['ts_code']}")
-            print(f"股票名称：{stock_data['name']}")
-            print(f"当前价格：{stock_data['price']:.2f} 元")
-
+            # 显示基本信息，整段内容拼好后一次写出
+            out = []
             # 根据涨跌幅显示不同颜色
-            change_text = f"涨跌幅：{stock_data['change_percent']:.2f}%"
-            if stock_data['change_percent'] > 0:
-                print(f"{change_text} 📈")
-            elif stock_data['change_percent'] < 0:
-                print(f"{change_text} 📉")
-            else:
-                print(f"{change_text} ➖")
+            change = stock_data['change_percent']
+            change_arrow = "📈" if change > 0 else "📉" if change < 0 else "➖"
+            out.append(STOCK_INFO_TMPL.format(change_arrow=change_arrow, **stock_data))
 
-            print(f"市盈率(TTM)：{stock_data['pe_ttm']:.2f}")
-            print(f"市净率：{stock_data['pb']:.2f}")
-            print(f"ROE：{stock_data['roe']:.2f}%")  # 添加ROE显示
-            print(f"所属行业：{stock_data['industry']}")
-            print("-" * 60)
-
-            # 获取技术指标
-            print("\n正在获取技术指标...")
-            tech_data = fetch_data_with_retry(api.get_technical_indicators, stock_code)
             if tech_data:
-                print("\n" + "="*20 + " 技术指标分析 " + "="*20)
-
-                # 显示MACD指标
-                if 'MACD' in tech_data:
-                    macd = tech_data['MACD']
-                    print("\n【MACD指标】")
-                    print(f"  趋势判断: {macd['trend']}")
-                    print(f"  DIF线: {macd['DIF']:.3f}")
-                    print(f"  DEA线: {macd['DEA']:.3f}")
-                    print(f"  MACD值: {macd['MACD']:.3f}")
-
-                # 显示KDJ指标
-                if 'KDJ' in tech_data:
-                    kdj = tech_data['KDJ']
-                    print("\n【KDJ指标】")
-                    print(f"  趋势判断: {kdj['trend']}")
-                    print(f"  K值: {kdj['K']:.2f}")
-                    print(f"  D值: {kdj['D']:.2f}")
-                    print(f"  J值: {kdj['J']:.2f}")
-
-                # 显示RSI指标
-                if 'RSI' in tech_data:
-                    rsi = tech_data['RSI']
-                    print("\n【RSI指标】")
-                    print(f"  趋势判断: {rsi['trend']}")
-                    print(f"  RSI值: {rsi['RSI']:.2f}")
-
-                # 显示BOLL指标 - 新添加
-                if 'BOLL' in tech_data:
-                    boll = tech_data['BOLL']
-                    print("\n【BOLL指标】")
-                    print(f"  趋势判断: {boll['trend']}")
-                    print(f"  上轨: {boll['UPPER']:.2f}")
-                    print(f"  中轨: {boll['MID']:.2f}")
-                    print(f"  下轨: {boll['LOWER']:.2f}")
-
-                # 显示移动平均线 - 新添加
-                if 'MA' in tech_data:
-                    ma = tech_data['MA']
-                    print("\n【移动平均线】")
-                    print(f"  趋势判断: {ma['trend']}")
-                    print(f"  MA5: {ma['MA5']:.2f}")
-                    print(f"  MA10: {ma['MA10']:.2f}")
-                    print(f"  MA30: {ma['MA30']:.2f}")
-                    print(f"  MA60: {ma['MA60']:.2f}")
-
-                # 显示量价关系
-                if 'price_data' in tech_data:
-                    price = tech_data['price_data']
-                    print("\n【量价信息】")
-                    print(f"  成交量: {price['volume']:,.0f}手")
-                    print(f"  换手率: {price['turnover']:.2f}%")
-                    print(f"  振幅: {price['amplitude']:.2f}%")
+                out.append("\n" + "="*20 + " 技术指标分析 " + "="*20)
+
+                # 依次显示MACD、KDJ、RSI、BOLL、移动平均线和量价信息
+                for key, template in TECH_BLOCK_TMPLS:
+                    if key in tech_data:
+                        out.append(template.format_map(tech_data[key]))
 
                 # 技术综合判断 - 新添加
-                print("\n【技术综合判断】")
+                out.append("\n【技术综合判断】")
                 tech_signals = []
-                if 'MACD' in tech_data and tech_data['MACD']['trend'] in ['金叉', '上升']:
-                    tech_signals.append("MACD多头信号")
-                if 'KDJ' in tech_data:
-                    if tech_data['KDJ']['trend'] == '超卖':
-                        tech_signals.append("KDJ超卖反弹信号")
-                    elif tech_data['KDJ']['trend'] == '超买':
-                        tech_signals.append("KDJ超买回调信号")
-                if 'RSI' in tech_data:
-                    if tech_data['RSI']['trend'] == '超卖':
-                        tech_signals.append("RSI超卖反弹信号")
-                    elif tech_data['RSI']['trend'] == '超买':
-                        tech_signals.append("RSI超买回调信号")
-                if 'BOLL' in tech_data:
-                    if tech_data['BOLL']['trend'] == '突破上轨':
-                        tech_signals.append("BOLL突破上轨-强势信号")
-                    elif tech_data['BOLL']['trend'] == '突破下轨':
-                        tech_signals.append("BOLL突破下轨-反弹信号")
+                for key, trends, signal in TECH_SIGNAL_RULES:
+                    indicator = tech_data.get(key)
+                    if indicator and indicator.get('trend') in trends:
+                        tech_signals.append(signal)
 
                 if tech_signals:
-                    print("  " + ", ".join(tech_signals))
+                    out.append("  " + ", ".join(tech_signals))
                 else:
-                    print("  暂无明确信号，可能处于盘整阶段")
+                    out.append("  暂无明确信号，可能处于盘整阶段")
 
-                print("="*50)
+                out.append("="*50)
 
                 # 更新股票数据，用于后续分析
                 stock_data.update(tech_data)
             else:
-                print("获取技术指标失败，将使用有限数据进行分析")
+                out.append("获取技术指标失败，将使用有限数据进行分析")
+
+            sys.stdout.write("\n".join(out) + "\n")
 
             # 用户选择分析方法
             print("\n请选择分析类型：")
@@ -230,16 +262,23 @@ def main():
                 if choice == "5":
                     # AI分析
                     print("\n正在进行AI分析，请稍候...")
-                    report = agents[choice].analyze_stock(stock_data)
                     print("\n" + "-" * 50)
                     print("AI智能分析报告")
                     print("-" * 50)
-                    print(report if report else "AI分析生成失败，请检查Ollama服务是否运行")
+                    received = False
+                    for chunk in get_agent(choice).analyze_stock(stock_data):
+                        received = True
+                        print(chunk, end="", flush=True)
+                    if received:
+                        print()
+                    else:
+                        print("AI分析生成失败，请检查Ollama服务是否运行")
                 else:
                     # 传统分析方法
-                    report = agents[choice].analyze(stock_data)
+                    agent = get_agent(choice)
+                    report = agent.analyze(stock_data)
                     print("\n" + "-" * 50)
-                    print(f"{agents[choice].strategy.upper()} 分析报告")
+                    print(f"{agent.strategy.upper()} 分析报告")
                     print("-" * 50)
                     print(report)
 
@@ -254,20 +293,160 @@ def main():
             print(f"发生错误: {str(e)}")
             continue
 
+def _format_stock_code(code_or_name: str) -> Optional[str]:
+    """纯数字代码按前缀补上市场标识，无法识别的数字代码返回 None，其他输入原样返回"""
+    if code_or_name.isdigit():
+        prefix = code_or_name[:3]
+        if prefix in SH_PREFIXES:
+            return f"sh{code_or_name}"
+        if prefix in SZ_PREFIXES:
+            return f"sz{code_or_name}"
+        return None
+    return code_or_name
+
+def _tech_signals_batch(tech_list: List[Dict[str, Any]]) -> List[List[str]]:
+    """批量计算技术综合判断信号，每个指标的趋势只取一次，按规则逐条用布尔掩码判断
+
+    Args:
+        tech_list: 每只股票的技术指标字典，获取失败的股票传空字典
+
+    Returns:
+        与 tech_list 顺序一致的信号列表，规则顺序与 TECH_SIGNAL_RULES 相同
+    """
+    signals = [[] for _ in tech_list]
+    trends = {}
+    for key, rule_trends, signal in TECH_SIGNAL_RULES:
+        if key not in trends:
+            trends[key] = np.array([(tech.get(key) or {}).get('trend', '') for tech in tech_list])
+        for i in np.flatnonzero(np.isin(trends[key], list(rule_trends))):
+            signals[i].append(signal)
+    return signals
+
+def _scan_watchlist(api: EastMoneyAPI, codes: List[str]) -> List[str]:
+    """批量获取自选股行情和技术指标，每只股票输出一行技术信号
+
+    批量结果按单只股票写入接口结果缓存，之后单独分析其中的股票时不再重复请求。
+
+    Returns:
+        格式化并去重后的有效股票代码
+    """
+    stock_codes = []
+    for code in filter(None, (code.strip() for code in codes)):
+        stock_code = _format_stock_code(code)
+        if stock_code is None:
+            print(f"无效的股票代码：{code}")
+        else:
+            stock_codes.append(stock_code)
+    stock_codes = list(dict.fromkeys(stock_codes))
+    if not stock_codes:
+        return stock_codes
+
+    print(f"\n正在获取 {len(stock_codes)} 只股票的数据...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        quotes_future = executor.submit(fetch_data_with_retry, api.get_realtime_quotes_batch, stock_codes)
+        tech_future = executor.submit(fetch_data_with_retry, api.get_technical_indicators_batch, stock_codes)
+        quotes = quotes_future.result() or {}
+        tech = tech_future.result() or {}
+    for stock_code, quote in quotes.items():
+        _cache_fetch_result("get_realtime_quotes", (stock_code,), quote)
+    for stock_code, indicators in tech.items():
+        _cache_fetch_result("get_technical_indicators", (stock_code,), indicators)
+
+    signals = _tech_signals_batch([tech.get(code, {}) for code in stock_codes])
+    out = ["", "=" * 20 + " 自选股技术信号 " + "=" * 20]
+    for stock_code, stock_signals in zip(stock_codes, signals):
+        quote = quotes.get(stock_code)
+        if quote:
+            head = (f"{stock_code} {quote.get('name', stock_code)} "
+                    f"{quote.get('price', 0.0):.2f} 元 {quote.get('change_percent', 0.0):.2f}%")
+        else:
+            head = f"{stock_code} 获取行情失败"
+        if stock_code not in tech:
+            out.append(f"{head} | 获取技术指标失败")
+        else:
+            out.append(f"{head} | {', '.join(stock_signals) or '暂无明确信号'}")
+    out.append("=" * 50)
+    sys.stdout.write("\n".join(out) + "\n")
+    return stock_codes
+
+def _prefetch_stocks(api: EastMoneyAPI, stock_codes: List[str], funcs=None) -> None:
+    """在后台线程中依次获取这些股票的数据，结果写入接口结果缓存，之后查询时直接命中
+
+    预取线程是守护线程，退出程序时不等待它完成。
+
+    Args:
+        api: 东方财富数据获取器
+        stock_codes: 股票代码
+        funcs: 要预取的接口，默认为财务指标和技术指标；实时行情缓存时间短于用户查看报告的时间，不预取
+    """
+    if not stock_codes:
+        return
+    if funcs is None:
+        funcs = (api.get_financial_indicators, api.get_technical_indicators)
+
+    def prefetch():
+        for stock_code in stock_codes:
+            for func in funcs:
+                fetch_data_with_retry(func, stock_code)
+
+    threading.Thread(target=prefetch, daemon=True).start()
+
+def _create_ai_analyzer():
+    """创建AI分析器；构造时会连接Ollama预加载模型，因此在选择AI分析时才导入和创建"""
+    from ai_analyzer import AIAnalyzer
+    return AIAnalyzer()
+
+def _cache_fetch_result(func_name: str, args: tuple, data: Any) -> None:
+    """按 fetch_data_with_retry 的缓存键写入接口结果，用于把批量接口的结果拆分到单只股票"""
+    ttl = FETCH_CACHE_TTL.get(func_name)
+    if ttl is not None and data:
+        FETCH_CACHE.set(FileCache.make_key(func_name, args), data, ttl)
+
 def fetch_data_with_retry(func, *args):
+    ttl = FETCH_CACHE_TTL.get(func.__name__)
+    if ttl is not None:
+        key = FileCache.make_key(func.__name__, args)
+        data = FETCH_CACHE.get(key)
+        if data is not None:
+            return data
+
     retries = 0
     while retries < MAX_RETRIES:
         try:
             data = func(*args)
+            # 空结果通常表示请求失败，不写入缓存
+            if ttl is not None and data:
+                FETCH_CACHE.set(key, data, ttl)
             return data
         except requests.RequestException as e:
             logging.error(f"网络请求出错: {str(e)}, 第 {retries + 1} 次重试...")
             retries += 1
-            time.sleep(RETRY_DELAY)
+            # 最后一次失败后直接返回，不再等待
+            if retries < MAX_RETRIES:
+                time.sleep(_retry_delay(e, retries - 1))
         except Exception as e:
             logging.error(f"数据获取出错: {str(e)}")
             break
     return None
 
+def _retry_delay(error: requests.RequestException, retries: int) -> float:
+    """计算第 retries 次失败后的等待时间：指数退避加随机抖动，限流时遵循 Retry-After"""
+    response = getattr(error, "response", None)
+    if response is not None and response.status_code in RETRY_AFTER_STATUS:
+        try:
+            return min(RETRY_MAX_DELAY, max(0.0, float(response.headers["Retry-After"])))
+        except (KeyError, ValueError):
+            pass
+    return min(RETRY_MAX_DELAY, RETRY_DELAY * (2 ** retries + random.random()))
+
 if __name__ == "__main__":
+    # 进程级的设置只在作为脚本运行时执行一次，被导入时不修改调用方的日志和输出配置
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    # 设置标准输出的编码为 UTF-8，原地修改以保留原有的缓冲方式
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+    except AttributeError:
+        pass
     main()
\ No newline at end of file
@@ -1,12 +1,13 @@
-# -*- coding: gbk -*-
+# -*- coding: utf-8 -*-
 
+import functools
 import os
 import datetime
 
 
+@functools.lru_cache(maxsize=1)
 def create_output_dir():
-    """Ŀ¼"""
+    """创建输出目录，每个进程只创建一次"""
     output_dir = "reports"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
     return output_dir